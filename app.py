@@ -4,17 +4,24 @@ Streamlit前端界面
 """
 
 import streamlit as st
-import requests
-import json
+import httpx
+import orjson
+import html
+import hashlib
+import string
+from collections import deque
 from datetime import datetime
 import asyncio
 from typing import List, Dict, Any
+from dataclasses import dataclass
 import os
 import time
+import random
+import threading
+import uuid
 from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+from src.utils.cache import LRUCache, DiskCache
 
 # 页面配置
 st.set_page_config(
@@ -24,325 +31,725 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 自定义CSS
-st.markdown("""
-    <style>
-    /* 全局样式 */
-    .main {
-        padding: 0rem;
-    }
-    
-    /* 标题样式 */
-    .app-title {
-        text-align: center;
-        font-size: 3rem;
-        font-weight: bold;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        padding: 2rem 0;
-    }
-    
-    /* 搜索区域样式 */
-    .search-container {
-        max-width: 600px;
-        margin: 0 auto;
-        padding: 2rem;
-        background: white;
-        border-radius: 15px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
-    
-    /* 按钮样式 */
-    .stButton>button {
-        background: linear-gradient(135deg, #ff6b6b 0%, #ff8e8e 100%);
-        color: white;
-        border: none;
-        padding: 0.8rem 2rem;
-        border-radius: 25px;
-        font-weight: bold;
-        font-size: 1.1rem;
-        box-shadow: 0 4px 15px rgba(255, 107, 107, 0.3);
-        transition: all 0.3s ease;
-        width: 100%;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(255, 107, 107, 0.4);
-    }
-    
-    /* 输入框样式 */
-    .stTextInput>div>div>input {
-        border-radius: 10px;
-        border: 2px solid #e0e0e0;
-        padding: 0.8rem;
-        font-size: 1.1rem;
-        transition: all 0.3s ease;
-    }
-    
-    .stTextInput>div>div>input:focus {
-        border-color: #667eea;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-    }
-    
-    /* 数字输入框样式 */
-    .stNumberInput>div>div>input {
-        border-radius: 10px;
-        border: 2px solid #e0e0e0;
-        padding: 0.8rem;
-        font-size: 1.1rem;
-    }
-    
-    /* 电影卡片样式 */
-    .movie-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 2rem;
-        border-radius: 15px;
-        margin: 2rem 0;
-        box-shadow: 0 8px 32px rgba(102, 126, 234, 0.2);
-    }
-    
-    /* 影评区域样式 */
-    .review-section {
-        background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%);
-        padding: 2.5rem;
-        border-radius: 15px;
-        margin: 2rem 0;
-        border-left: 5px solid #ff6b6b;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
-    }
-    
-      
-    /* 进度条样式 */
-    .loading-container {
-        text-align: center;
-        padding: 3rem;
-    }
-    
-    .loading-spinner {
-        border: 4px solid #f3f3f3;
-        border-top: 4px solid #667eea;
-        border-radius: 50%;
-        width: 50px;
-        height: 50px;
-        animation: spin 1s linear infinite;
-        margin: 0 auto 1rem;
-    }
-    
-    @keyframes spin {
-        0% { transform: rotate(0deg); }
-        100% { transform: rotate(360deg); }
-    }
-    
-    /* 导航栏样式 */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 24px;
-    }
+
+@dataclass
+class TimeoutConfig:
+    """HTTP超时与重试配置（秒），可通过环境变量覆盖"""
+    connect: int = 5
+    read_search: int = 15
+    read_popular: int = 15
+    read_review: int = 90
+    retries: int = 3
     
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: pre-wrap;
-        background-color: transparent;
-        border-radius: 25px;
-        padding: 0 20px;
-        font-weight: 600;
-        border: none;
-        transition: all 0.3s ease;
+    @classmethod
+    def from_env(cls) -> "TimeoutConfig":
+        return cls(
+            connect=int(os.getenv("HTTP_CONNECT_TIMEOUT", cls.connect)),
+            read_search=int(os.getenv("HTTP_READ_TIMEOUT_SEARCH", cls.read_search)),
+            read_popular=int(os.getenv("HTTP_READ_TIMEOUT_POPULAR", cls.read_popular)),
+            read_review=int(os.getenv("HTTP_READ_TIMEOUT_REVIEW", cls.read_review)),
+            retries=int(os.getenv("HTTP_MAX_RETRIES", cls.retries))
+        )
+
+
+@st.cache_resource
+def load_config() -> Dict[str, Any]:
+    """加载.env并读取配置，整个进程只解析一次"""
+    load_dotenv()
+    return {
+        "KIMI_API_KEY": os.getenv("KIMI_API_KEY", ""),
+        "TMDB_API_KEY": os.getenv("TMDB_API_KEY", ""),
+        "API_BASE_URL": os.getenv("API_BASE_URL", "http://localhost:8001"),
+        "STATIC_BASE_URL": os.getenv("STATIC_BASE_URL", ""),
+        "TIMEOUTS": TimeoutConfig.from_env()
     }
+
+
+# API配置
+API_BASE_URL = load_config()["API_BASE_URL"]
+TIMEOUTS = load_config()["TIMEOUTS"]
+# 浏览器访问静态资源的地址，默认与后端API同源
+STATIC_BASE_URL = (load_config()["STATIC_BASE_URL"] or f"{API_BASE_URL}/static").rstrip("/")
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 需要重试的HTTP状态码；只对幂等请求按状态码重试，POST（生成、批量、保存影评）可能已被后端受理，重试会重复执行
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+class RetryTransport(httpx.HTTPTransport):
+    """对连接错误做重试、对GET/HEAD请求的可重试状态码做指数退避重试的传输层"""
     
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-    }
+    def __init__(self, retries: int = 3, backoff_factor: float = 0.5, **kwargs):
+        super().__init__(retries=retries, **kwargs)
+        self.max_retries = retries
+        self.backoff_factor = backoff_factor
     
-    /* 侧边栏样式 */
-    .css-1d391kg {
-        background-color: #f8f9fa;
-    }
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return super().handle_request(request)
+        for attempt in range(self.max_retries + 1):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            response.close()
+            time.sleep(self.backoff_factor * (2 ** attempt))
+        return response
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """获取复用连接池的HTTP/2客户端（跨rerun和用户共享）"""
+    return httpx.Client(
+        transport=RetryTransport(
+            retries=TIMEOUTS.retries,
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        ),
+        timeout=httpx.Timeout(TIMEOUTS.read_search, connect=TIMEOUTS.connect)
+    )
+
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "app.css")
+
+@st.cache_resource
+def _css_link() -> str:
+    """构建样式表<link>标签，URL带内容哈希，样式更新后浏览器缓存自动失效"""
+    with open(CSS_PATH, "rb") as f:
+        version = hashlib.blake2b(f.read(), digest_size=4).hexdigest()
+    return f'<link rel="stylesheet" href="{STATIC_BASE_URL}/app.css?v={version}">'
+
+def inject_css():
+    """引用由FastAPI /static 提供的自定义样式
+
+    Streamlit会移除本次重跑中未再次输出的元素，因此每次整页重跑都需输出<link>；
+    样式表本身只由浏览器下载一次并缓存。
+    """
+    st.markdown(_css_link(), unsafe_allow_html=True)
+
+# 每个会话保留的历史条数，以及进程内保存完整影评的条数
+HISTORY_MAX_ENTRIES = 50
+REVIEW_STORE_MAX_ENTRIES = 500
+
+# 相同参数的影评结果缓存
+REVIEW_CACHE_TTL = 1800
+REVIEW_CACHE_MAX_ENTRIES = 128
+
+# 持久化影评缓存（进程重启后仍可命中）
+REVIEW_DISK_CACHE_PATH = os.getenv("REVIEW_CACHE_PATH", ".review_cache/reviews.sqlite3")
+REVIEW_DISK_CACHE_TTL = 7 * 24 * 60 * 60
+
+@st.cache_resource
+def _review_store() -> LRUCache:
+    """进程内影评全文存储（LRU），历史记录中只保存索引"""
+    return LRUCache(maxsize=REVIEW_STORE_MAX_ENTRIES)
+
+@st.cache_resource
+def _review_result_cache() -> LRUCache:
+    """进程内影评结果缓存，值为 (影评, 电影信息)"""
+    return LRUCache(maxsize=REVIEW_CACHE_MAX_ENTRIES, ttl=REVIEW_CACHE_TTL)
+
+@st.cache_resource
+def _review_disk_cache() -> DiskCache:
+    """持久化影评结果缓存，值为orjson编码的 [影评, 电影信息]"""
+    return DiskCache(REVIEW_DISK_CACHE_PATH, ttl=REVIEW_DISK_CACHE_TTL)
+
+def save_review(review_data: Dict[str, Any]) -> str:
+    """保存影评全文并返回其ID"""
+    payload = orjson.dumps(review_data, option=orjson.OPT_SORT_KEYS, default=str)
+    review_id = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    _review_store().set(review_id, review_data)
+    return review_id
+
+def get_review_by_id(review_id: str) -> Dict[str, Any]:
+    """按ID读取影评全文，已被淘汰时返回None"""
+    return _review_store().get(review_id)
+
+# 界面上的影评风格选项 -> 接口参数
+STYLE_MAPPING = {
+    "专业学术": "professional",
+    "轻松休闲": "casual",
+    "学术分析": "academic",
+    "娱乐导向": "entertaining",
+    "简洁明了": "brief"
+}
+
+# 影评生成参数的默认值（顺序与_build_request_data的参数一致）
+REVIEW_OPTION_DEFAULTS = {
+    "target_audience": "普通观众",
+    "review_style": "professional",
+    "max_length": 1000,
+    "include_spoilers": False
+}
+
+def review_options(options: Dict[str, Any]) -> tuple:
+    """按固定顺序取出影评生成参数，缺省的使用默认值"""
+    return tuple(options.get(name, default) for name, default in REVIEW_OPTION_DEFAULTS.items())
+
+def review_cache_key(title: str, year: int = None, **kwargs) -> tuple:
+    """规范化影评参数作为缓存键（标题忽略大小写和首尾空白）"""
+    return (title.strip().lower(), year, *review_options(kwargs))
+
+def _disk_cache_key(key: tuple) -> str:
+    """将规范化参数转换为持久化缓存的键"""
+    return hashlib.sha256(orjson.dumps(key)).hexdigest()
+
+def generate_review_cached(generate, title: str, year: int = None, regenerate: bool = False,
+                           **kwargs) -> Dict[str, Any]:
+    """参数相同时直接返回缓存的影评，否则调用generate生成并缓存；regenerate为True时跳过缓存重新生成"""
+    cache = _review_result_cache()
+    key = review_cache_key(title, year, **kwargs)
+    cached = None if regenerate else cache.get(key)
+    if cached is None and not regenerate:
+        # 进程内未命中时再查持久化缓存
+        payload = _review_disk_cache().get(_disk_cache_key(key))
+        if payload is not None:
+            cached = tuple(orjson.loads(payload))
+            cache.set(key, cached)
+    if cached is not None:
+        review_data, movie_info = cached
+        st.session_state.current_movie = movie_info
+        return review_data
     
-    /* 响应式设计 */
-    @media (max-width: 768px) {
-        .search-container {
-            margin: 1rem;
-            padding: 1.5rem;
-        }
-        
-        .app-title {
-            font-size: 2rem;
-            padding: 1rem 0;
-        }
-    }
-    </style>
-""", unsafe_allow_html=True)
+    st.session_state.current_movie = None
+    review_data = generate(title, year, regenerate=regenerate, **kwargs)
+    if review_data:
+        _cache_review_result(key, review_data, st.session_state.get('current_movie'))
+    return review_data
 
-# API配置
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8001")
+def _cache_review_result(key: tuple, review_data: Dict[str, Any], movie_info: Dict[str, Any]):
+    """把影评结果写入进程内和持久化缓存"""
+    cached = (review_data, movie_info)
+    _review_result_cache().set(key, cached)
+    _review_disk_cache().set(_disk_cache_key(key), orjson.dumps(cached, default=str))
 
 def init_session_state():
     """初始化会话状态"""
     if 'review_history' not in st.session_state:
-        st.session_state.review_history = []
+        st.session_state.review_history = deque(maxlen=HISTORY_MAX_ENTRIES)
     if 'current_movie' not in st.session_state:
         st.session_state.current_movie = None
     if 'current_review' not in st.session_state:
         st.session_state.current_review = None
 
-@st.cache_data(ttl=3600)
+@st.cache_resource
+def get_async_runtime():
+    """获取后台事件循环及绑定其上的httpx异步客户端（HTTP/2 + keep-alive）"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True, name="http-async-loop").start()
+    client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(60.0, connect=TIMEOUTS.connect)
+    )
+    return loop, client
+
+def run_async(coro):
+    """在共享事件循环中执行协程并等待结果"""
+    loop, _ = get_async_runtime()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+@st.cache_resource
+def get_tmdb_image_client() -> httpx.AsyncClient:
+    """TMDB海报图片专用的HTTP/2客户端，仅在共享事件循环中使用"""
+    return httpx.AsyncClient(
+        http2=True,
+        base_url="https://image.tmdb.org",
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(10.0, connect=TIMEOUTS.connect)
+    )
+
+@st.cache_resource
+def _poster_cache() -> LRUCache:
+    """海报图片缓存（url -> bytes）"""
+    return LRUCache(maxsize=256, ttl=86400)
+
+async def prefetch_posters(urls: List[str]) -> Dict[str, bytes]:
+    """并发下载海报（多路复用同一TMDB连接），写入缓存并返回成功的结果"""
+    cache = _poster_cache()
+    client = get_tmdb_image_client()
+    pending = [url for url in dict.fromkeys(urls) if url and url not in cache]
+    
+    responses = await asyncio.gather(*(client.get(url) for url in pending), return_exceptions=True)
+    for url, response in zip(pending, responses):
+        if isinstance(response, httpx.Response) and response.status_code == 200:
+            cache.set(url, response.content)
+    
+    return {url: cache.get(url) for url in urls if url in cache}
+
+def load_poster_bytes(url: str) -> bytes:
+    """获取海报图片，优先读取缓存"""
+    poster = _poster_cache().get(url)
+    if poster is None:
+        poster = run_async(prefetch_posters([url])).get(url)
+    return poster
+
+async def asearch_movies(query: str, year: int = None) -> List[Dict[str, Any]]:
+    """异步搜索电影"""
+    _, client = get_async_runtime()
+    params = {"query": query}
+    if year and year > 0:
+        params["year"] = year
+    
+    response = await client.get(
+        f"{API_BASE_URL}/api/search",
+        params=params,
+        timeout=httpx.Timeout(TIMEOUTS.read_search, connect=TIMEOUTS.connect)
+    )
+    if response.status_code == 200:
+        return [orjson.loads(response.content)]
+    return []
+
+async def aget_popular_movies(page: int = 1) -> List[Dict[str, Any]]:
+    """异步获取热门电影"""
+    _, client = get_async_runtime()
+    response = await client.get(
+        f"{API_BASE_URL}/api/popular",
+        params={"page": page},
+        timeout=httpx.Timeout(TIMEOUTS.read_popular, connect=TIMEOUTS.connect)
+    )
+    if response.status_code == 200:
+        return orjson.loads(response.content)
+    return []
+
+async def astart_review(request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """异步提交影评生成任务"""
+    _, client = get_async_runtime()
+    response = await client.post(
+        f"{API_BASE_URL}/api/review",
+        content=orjson.dumps(request_data),
+        headers=JSON_HEADERS,
+        timeout=httpx.Timeout(TIMEOUTS.read_review, connect=TIMEOUTS.connect)
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+# 已上映电影的元数据基本不变，热门榜单按天变化
+MOVIE_CACHE_TTL = 24 * 60 * 60
+POPULAR_CACHE_TTL = 6 * 60 * 60
+
+# 缓存函数内不捕获异常：失败结果不会被缓存，下次调用会重新请求
+@st.cache_data(ttl=MOVIE_CACHE_TTL, max_entries=1024, show_spinner=False)
+def _search_movies_cached(query: str, year: int = None) -> List[Dict[str, Any]]:
+    return run_async(asearch_movies(query, year))
+
+@st.cache_data(ttl=POPULAR_CACHE_TTL, max_entries=64, show_spinner=False)
+def _popular_movies_cached(page: int = 1) -> List[Dict[str, Any]]:
+    movies = run_async(aget_popular_movies(page))
+    run_async(prefetch_posters([movie.get("poster_url") for movie in movies]))
+    return movies
+
 def search_movies(query: str, year: int = None) -> List[Dict[str, Any]]:
     """搜索电影"""
     try:
-        params = {"query": query}
-        if year and year > 0:
-            params["year"] = year
-            
-        response = requests.get(f"{API_BASE_URL}/api/search", params=params)
-        if response.status_code == 200:
-            return [response.json()]
-        return []
+        return _search_movies_cached(query, year)
     except Exception as e:
         st.error(f"搜索失败: {e}")
         return []
 
-@st.cache_data(ttl=3600)
 def get_popular_movies(page: int = 1) -> List[Dict[str, Any]]:
-    """获取热门电影"""
+    """获取热门电影（同时预取海报）"""
     try:
-        response = requests.get(f"{API_BASE_URL}/api/popular", params={"page": page})
-        if response.status_code == 200:
-            return response.json()
-        return []
+        return _popular_movies_cached(page)
     except Exception as e:
         st.error(f"获取热门电影失败: {e}")
         return []
 
-def generate_review(title: str, year: int = None, **kwargs) -> Dict[str, Any]:
+class TaskExpiredError(Exception):
+    """后端任务已不存在（服务重启或已被清理）"""
+
+
+def _build_request_data(title: str, year: int, target_audience: str, review_style: str,
+                        max_length: int, include_spoilers: bool, regenerate: bool = False) -> Dict[str, Any]:
+    """构建影评生成请求体（regenerate为True时后端跳过已缓存的生成结果）"""
+    return {
+        "title": title,
+        "year": year,
+        "target_audience": target_audience,
+        "review_style": review_style,
+        "max_length": max_length,
+        "max_output_tokens": max_length * 2,
+        "include_spoilers": include_spoilers,
+        "regenerate": regenerate
+    }
+
+@st.cache_resource
+def _review_task_cache() -> LRUCache:
+    """已提交的影评任务（生成参数 -> (电影信息, 任务ID)），跨用户共享；任务失效时只移除对应参数的条目"""
+    return LRUCache(maxsize=64, ttl=1800)
+
+def _start_review_task(title: str, year: int, target_audience: str, review_style: str,
+                       max_length: int, include_spoilers: bool, regenerate: bool = False):
+    """提交影评任务，参数相同的请求直接复用已有任务（返回 电影信息, 任务ID）；regenerate时总是提交新任务"""
+    key = (title, year, target_audience, review_style, max_length, include_spoilers)
+    cached = None if regenerate else _review_task_cache().get(key)
+    if cached is not None:
+        return cached
+    
+    request_data = _build_request_data(
+        title, year, target_audience, review_style, max_length, include_spoilers, regenerate=regenerate
+    )
+    
+    # 并发获取电影信息并启动生成任务
+    async def _start():
+        return await asyncio.gather(
+            asearch_movies(title, year),
+            astart_review(request_data),
+            return_exceptions=True
+        )
+    
+    movies, task_info = run_async(_start())
+    if isinstance(task_info, Exception):
+        raise task_info
+    
+    entry = (movies if isinstance(movies, list) else []), task_info["task_id"]
+    _review_task_cache().set(key, entry)
+    return entry
+
+def generate_review(title: str, year: int = None, regenerate: bool = False, **kwargs) -> Dict[str, Any]:
     """生成影评 - 使用实时进度显示"""
+    params = (title, year, *review_options(kwargs))
     try:
-        request_data = {
-            "title": title,
-            "year": year,
-            "target_audience": kwargs.get("target_audience", "普通观众"),
-            "review_style": kwargs.get("review_style", "professional"),
-            "max_length": kwargs.get("max_length", 1000),
-            "include_spoilers": kwargs.get("include_spoilers", False)
-        }
+        movies, task_id = _start_review_task(*params, regenerate=regenerate)
+        if movies:
+            st.session_state.current_movie = movies[0]
         
-        # 启动任务
-        response = requests.post(
-            f"{API_BASE_URL}/api/review",
-            json=request_data,
-            timeout=10
-        )
+        # 订阅状态推送
+        try:
+            result = follow_review_status(task_id)
+        except TaskExpiredError:
+            # 缓存的任务已失效，重新提交
+            _review_task_cache().pop(params)
+            _, task_id = _start_review_task(*params)
+            result = follow_review_status(task_id)
         
-        if response.status_code == 200:
-            task_info = response.json()
-            task_id = task_info["task_id"]
+        if result is None:
+            # 失败或超时的任务不应被复用
+            _review_task_cache().pop(params)
+        return result
+    except httpx.HTTPStatusError as e:
+        st.error(f"生成影评失败: {e.response.text}")
+        return None
+    except Exception as e:
+        st.error(f"请求失败: {e}")
+        return None
+
+
+def stream_review(title: str, year: int = None, regenerate: bool = False, **kwargs) -> Dict[str, Any]:
+    """流式生成影评 - 边生成边显示文本"""
+    request_data = _build_request_data(title, year, *review_options(kwargs), regenerate=regenerate)
+    view = ProgressView()
+    outcome = {}
+    
+    try:
+        client = get_http_client()
+        with client.stream(
+            "POST",
+            f"{API_BASE_URL}/api/review/stream",
+            content=orjson.dumps(request_data),
+            headers=JSON_HEADERS,
+            timeout=httpx.Timeout(TIMEOUTS.read_review, connect=TIMEOUTS.connect)
+        ) as response:
+            if response.status_code != 200:
+                st.error(f"生成影评失败: {response.read().decode('utf-8', 'replace')}")
+                return None
             
-            # 轮询状态
-            return poll_review_status(task_id)
-        else:
-            st.error(f"生成影评失败: {response.text}")
-            return None
+            # 增量文本直接渲染进与最终结果相同的review-section
+            review_slot = st.empty()
+            parts = []
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = orjson.loads(line)
+                if "delta" in event:
+                    parts.append(event["delta"])
+                    review_slot.markdown(render_review_html("".join(parts)), unsafe_allow_html=True)
+                elif event.get("event") == "status":
+                    view.update(event.get("progress", 0), event.get("message", "处理中..."))
+                elif event.get("event") == "movie":
+                    st.session_state.current_movie = event["movie"]
+                elif event.get("event") == "result":
+                    outcome["result"] = event["result"]
+                elif event.get("event") == "error":
+                    outcome["error"] = event.get("error", "未知错误")
     except Exception as e:
         st.error(f"请求失败: {e}")
         return None
+    
+    if "error" in outcome:
+        st.error(f"生成失败: {outcome['error']}")
+        return None
+    return outcome.get("result")
+
+
+def generate_reviews_batch(items: List[Dict[str, Any]], regenerate: bool = False) -> List[Dict[str, Any]]:
+    """
+    批量生成影评，所有请求合并为一次 /api/review/batch 调用
+    
+    Args:
+        items: 每项包含title、year以及生成参数（target_audience等）
+        regenerate: 是否跳过后端已缓存的生成结果
+        
+    Returns:
+        与items一一对应的影评列表，生成失败的位置为None
+    """
+    movies = [
+        _build_request_data(item["title"], item.get("year"), *review_options(item), regenerate=regenerate)
+        for item in items
+    ]
+    client = get_http_client()
+    response = client.post(
+        f"{API_BASE_URL}/api/review/batch",
+        content=orjson.dumps({"movies": movies}),
+        headers=JSON_HEADERS,
+        # 服务端并发生成，整体耗时随数量增长，按条数放宽读超时
+        timeout=httpx.Timeout(TIMEOUTS.read_review * len(movies), connect=TIMEOUTS.connect)
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    
+    # 成功的影评按原顺序排列，失败项由failures中的index标出
+    failed = {failure["index"] for failure in data.get("failures", [])}
+    reviews = iter(data["reviews"])
+    return [None if index in failed else next(reviews) for index in range(len(items))]
+
+
+class ProgressView:
+    """生成进度显示：内容变化时才推送，并限制推送频率以减少前端重绘"""
+    
+    MIN_INTERVAL = 0.25
+    ELAPSED_INTERVAL = 2
+    
+    def __init__(self):
+        # UI元素由tab_generate创建并保存在session state中
+        state = st.session_state
+        self.progress_bar = state.progress_bar if 'progress_bar' in state else st.progress(0)
+        self.status_text = state.status_text if 'status_text' in state else st.empty()
+        self.time_elapsed = state.time_elapsed if 'time_elapsed' in state else st.empty()
+        self.start_time = time.time()
+        self._last_state = None
+        self._last_push = 0.0
+        self._last_elapsed = None
+    
+    def update(self, progress: int, message: str, step: str = None):
+        """更新进度（progress为0-100）"""
+        now = time.time()
+        state = (progress, message, step)
+        if state != self._last_state and now - self._last_push >= self.MIN_INTERVAL:
+            self._last_state = state
+            self._last_push = now
+            self.progress_bar.progress(progress / 100)
+            # 状态与步骤合并到一个元素中，每次只发送一帧
+            self.status_text.text(f"{message}\n当前步骤: {step}" if step else message)
+        
+        elapsed = int(now - self.start_time)
+        if self._last_elapsed is None or elapsed - self._last_elapsed >= self.ELAPSED_INTERVAL:
+            self._last_elapsed = elapsed
+            self.time_elapsed.text(f"⏱️ {elapsed}秒")
+
+
+def save_review_file(review_data: Dict[str, Any]) -> str:
+    """请求后端将影评保存为文件，返回文件将写入的完整路径"""
+    client = get_http_client()
+    response = client.post(
+        f"{API_BASE_URL}/api/review/save",
+        content=orjson.dumps(review_data),
+        headers=JSON_HEADERS
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)["path"]
+
+
+def follow_review_status(task_id: str) -> Dict[str, Any]:
+    """跟踪任务进度：优先使用SSE推送，连接失败时退回轮询"""
+    try:
+        return watch_review_status(task_id)
+    except TaskExpiredError:
+        raise
+    except Exception as e:
+        print(f"状态推送不可用，改为轮询: {e}")
+        return poll_review_status(task_id)
 
 
-def poll_review_status(task_id: str, max_attempts: int = 120) -> Dict[str, Any]:
-    """轮询影评生成状态"""
-    # 这些UI元素已经在主函数中创建了，这里不需要重复创建
-    progress_bar = st.session_state.get('progress_bar', st.progress(0))
-    status_text = st.session_state.get('status_text', st.empty())
-    step_text = st.session_state.get('step_text', st.empty())
-    time_elapsed = st.session_state.get('time_elapsed', st.empty())
+def watch_review_status(task_id: str) -> Dict[str, Any]:
+    """通过SSE订阅影评生成状态，服务端推送进度直至完成"""
+    view = ProgressView()
+    client = get_http_client()
     
+    with client.stream(
+        "GET",
+        f"{API_BASE_URL}/api/review/stream/{task_id}",
+        timeout=httpx.Timeout(TIMEOUTS.read_review, connect=TIMEOUTS.connect)
+    ) as response:
+        if response.status_code == 404:
+            raise TaskExpiredError(task_id)
+        response.raise_for_status()
+        
+        for line in response.iter_lines():
+            if not line or not line.startswith("data:"):
+                continue
+            status = orjson.loads(line[len("data:"):])
+            
+            view.update(status.get("progress", 0), status.get("message", "处理中..."),
+                        status.get("current_step", "未知"))
+            
+            if status.get("status") == "completed":
+                return status.get("result")
+            if status.get("status") == "error":
+                st.error(f"生成失败: {status.get('error', '未知错误')}")
+                return None
+    
+    raise ConnectionError("状态推送连接提前关闭")
+
+
+# 轮询间隔：从POLL_MIN_DELAY起按倍数增长至POLL_MAX_DELAY，并叠加随机抖动
+POLL_MIN_DELAY = 0.25
+POLL_MAX_DELAY = 2.0
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.1
+# 服务端长轮询挂起时间（秒）
+LONG_POLL_WAIT = 25
+
+def _poll_delay(attempt: int, progress_jump: int) -> float:
+    """计算下一次轮询前的等待时间；进度变化较快时缩短间隔以及时跟进"""
+    delay = min(POLL_MAX_DELAY, POLL_MIN_DELAY * (POLL_BACKOFF ** attempt))
+    if progress_jump >= 10:
+        delay /= 2
+    return delay + random.uniform(0, POLL_JITTER)
+
+def poll_review_status(task_id: str, max_wait: float = 120) -> Dict[str, Any]:
+    """
+    轮询影评生成状态，最长等待max_wait秒
+    
+    服务端支持长轮询时（返回version字段），状态不变的请求会在服务端挂起，
+    拿到新状态后立即发起下一次请求；否则按指数退避间隔轮询。
+    """
+    view = ProgressView()
+    client = get_http_client()
     attempt = 0
-    start_time = time.time()
+    last_progress = 0
+    version = None
+    deadline = time.time() + max_wait
     
-    while attempt < max_attempts:
+    while time.time() < deadline:
+        progress_jump = 0
         try:
-            response = requests.get(f"{API_BASE_URL}/api/review/status/{task_id}")
+            params = {"wait": LONG_POLL_WAIT, "since": version} if version is not None else None
+            # 同一HTTP/2连接上复用，无需每次握手
+            response = client.get(
+                f"{API_BASE_URL}/api/review/status/{task_id}",
+                params=params,
+                timeout=httpx.Timeout(LONG_POLL_WAIT + TIMEOUTS.read_search, connect=TIMEOUTS.connect)
+            )
+            if response.status_code == 404:
+                raise TaskExpiredError(task_id)
             if response.status_code == 200:
-                status = response.json()
+                status = orjson.loads(response.content)
+                version = status.get("version")
+                progress = status.get("progress", 0)
+                progress_jump = progress - last_progress
+                last_progress = progress
                 
-                # 更新进度显示
-                progress = status.get("progress", 0) / 100
-                progress_bar.progress(progress)
-                status_text.text(status.get("message", "处理中..."))
-                step_text.text(f"当前步骤: {status.get('current_step', '未知')}")
-                
-                # 更新计时器
-                elapsed = int(time.time() - start_time)
-                time_elapsed.text(f"⏱️ {elapsed}秒")
+                view.update(progress, status.get("message", "处理中..."),
+                            status.get("current_step", "未知"))
                 
                 if status.get("status") == "completed":
                     # 获取最终结果
-                    result_response = requests.get(f"{API_BASE_URL}/api/review/result/{task_id}")
+                    result_response = client.get(
+                        f"{API_BASE_URL}/api/review/result/{task_id}",
+                        timeout=httpx.Timeout(TIMEOUTS.read_review, connect=TIMEOUTS.connect)
+                    )
                     if result_response.status_code == 200:
-                        return result_response.json()
+                        return orjson.loads(result_response.content)
                 elif status.get("status") == "error":
                     st.error(f"生成失败: {status.get('error', '未知错误')}")
                     return None
+                
+                if version is not None and status.get("status") != "completed":
+                    # 长轮询：服务端已等待到新状态，无需再退避
+                    continue
             
-            attempt += 1
-            time.sleep(1)  # 每秒检查一次
-            
+        except TaskExpiredError:
+            raise
         except Exception as e:
             print(f"状态检查失败: {e}")
-            attempt += 1
-            time.sleep(1)
+        
+        time.sleep(_poll_delay(attempt, progress_jump))
+        attempt += 1
     
     # 超时处理
     st.error("生成超时，请重试")
     return None
 
+# 无海报时的占位图（内联SVG，无需网络请求）
+NO_POSTER_HTML = (
+    '<img width="200" alt="No Poster" src="data:image/svg+xml;utf8,'
+    "<svg xmlns='http://www.w3.org/2000/svg' width='200' height='300'>"
+    "<rect width='100%25' height='100%25' fill='%23667eea'/>"
+    "<text x='50%25' y='50%25' fill='%23ffffff' font-size='20' font-family='sans-serif' "
+    "text-anchor='middle' dominant-baseline='middle'>No Poster</text></svg>"
+    '">'
+)
+
+@st.fragment
 def display_movie_info(movie_info: Dict[str, Any]):
     """显示电影信息"""
     col1, col2 = st.columns([1, 3])
     
     with col1:
+        poster = None
         if movie_info.get("poster_url"):
-            st.image(movie_info["poster_url"], width=200)
+            try:
+                poster = load_poster_bytes(movie_info["poster_url"])
+            except Exception as e:
+                print(f"海报加载失败: {e}")
+        
+        if poster:
+            st.image(poster, width=200)
         else:
-            st.image("https://via.placeholder.com/200x300/667eea/ffffff?text=No+Poster", width=200)
+            st.markdown(NO_POSTER_HTML, unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"### {movie_info.get('title', '未知电影')}")
+        # 所有字段合并为一个markdown元素输出
+        lines = [f"### {movie_info.get('title', '未知电影')}"]
         
         if movie_info.get('year'):
-            st.write(f"**上映年份**: {movie_info['year']}")
+            lines.append(f"**上映年份**: {movie_info['year']}")
         
-          
         if movie_info.get('runtime'):
-            st.write(f"**片长**: {movie_info['runtime']}分钟")
+            lines.append(f"**片长**: {movie_info['runtime']}分钟")
         
         if movie_info.get('genre'):
-            genres = ", ".join(movie_info['genre'])
-            st.write(f"**类型**: {genres}")
+            lines.append(f"**类型**: {', '.join(movie_info['genre'])}")
         
         if movie_info.get('director'):
-            directors = ", ".join(movie_info['director'])
-            st.write(f"**导演**: {directors}")
+            lines.append(f"**导演**: {', '.join(movie_info['director'])}")
         
         if movie_info.get('cast'):
-            cast = ", ".join(movie_info['cast'][:5])
-            st.write(f"**主演**: {cast}")
+            lines.append(f"**主演**: {', '.join(movie_info['cast'][:5])}")
         
         if movie_info.get('plot'):
-            st.write(f"**剧情简介**: {movie_info['plot']}")
+            lines.append(f"**剧情简介**: {movie_info['plot']}")
+        
+        st.markdown("  \n".join(lines))
+
+# 影评HTML模板，导入时构建
+REVIEW_TPL = string.Template("<div class='review-section'><h4>影评内容</h4>$paragraphs</div>")
+
+def render_review_html(review_text: str) -> str:
+    """将影评文本渲染为review-section HTML（模型输出需转义，按段落渲染保留换行）"""
+    paragraphs = "".join(
+        f"<p>{html.escape(paragraph)}</p>"
+        for paragraph in review_text.split('\n') if paragraph.strip()
+    )
+    return REVIEW_TPL.substitute(paragraphs=paragraphs)
 
+@st.fragment
 def display_review(review_data: Dict[str, Any]):
     """显示影评内容"""
     st.markdown("---")
     st.markdown("### 📋 生成的影评")
     
     # 影评内容
-    review_text = review_data.get('review', '无内容')
-    st.markdown(f"<div class='review-section'><h4>影评内容</h4><p>{review_text}</p></div>", unsafe_allow_html=True)
+    st.markdown(render_review_html(review_data.get('review') or '无内容'), unsafe_allow_html=True)
     
     # 统计信息
     col1, col2, col3 = st.columns(3)
@@ -355,22 +762,14 @@ def display_review(review_data: Dict[str, Any]):
 
 
 
-def main():
-    """主应用"""
-    init_session_state()
+@st.fragment
+def tab_generate():
+    """首页：影评生成（独立重跑区域）"""
+    # 搜索区域
+    st.markdown('<div class="search-container">', unsafe_allow_html=True)
     
-    # 主标题
-    st.markdown('<h1 class="app-title">🎬 电影影评智能Agent</h1>', unsafe_allow_html=True)
-    st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666; margin-bottom: 2rem;">基于AI的智能影评生成系统 - 让每一部电影都有专业解读</p>', unsafe_allow_html=True)
-    
-    # 创建标签页
-    tab1, tab2, tab3, tab4 = st.tabs(["🏠 首页", "📊 历史记录", "⚙️ 设置", "ℹ️ 关于"])
-    
-    with tab1:
-        # 搜索区域
-        st.markdown('<div class="search-container">', unsafe_allow_html=True)
-        
-        # 搜索表单
+    # 搜索表单（提交前的输入变化不会触发重跑）
+    with st.form("review_form", clear_on_submit=False):
         col1, col2, col3 = st.columns([3, 1, 1])
         
         with col1:
@@ -382,7 +781,7 @@ def main():
             )
         
         with col2:
-            search_clicked = st.button("🔍 搜索", type="primary", use_container_width=True)
+            search_clicked = st.form_submit_button("🔍 搜索", type="primary", use_container_width=True)
         
         # 高级选项折叠面板
         with st.expander("⚙️ 高级选项", expanded=False):
@@ -397,7 +796,7 @@ def main():
                 
                 review_style = st.selectbox(
                     "影评风格",
-                    ["专业学术", "轻松休闲", "学术分析", "娱乐导向", "简洁明了"],
+                    list(STYLE_MAPPING),
                     help="选择影评的表达方式"
                 )
             
@@ -408,82 +807,91 @@ def main():
                     help="控制影评的长度"
                 )
                 include_spoilers = st.checkbox("包含剧透", value=False)
+                stream_output = st.checkbox("实时显示生成内容", value=True)
         
-        st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # 处理搜索；点击"重新生成"后的重跑沿用当前影评的搜索参数，并跳过各级缓存
+    regenerate = False
+    search_params = None
+    if search_clicked and movie_title:
+        search_params = {
+            "title": movie_title,
+            "year": None,  # 年份由TMDB自动确定
+            "target_audience": target_audience,
+            "review_style": STYLE_MAPPING[review_style],
+            "max_length": max_length,
+            "include_spoilers": include_spoilers
+        }
+    elif 'regenerate_params' in st.session_state:
+        search_params = st.session_state.pop('regenerate_params')
+        regenerate = True
+    
+    if search_params:
+        # 显示实时生成区域
+        st.markdown("---")
+        st.markdown("### 🤖 AI正在为您生成影评...")
         
-        # 处理搜索
-        if search_clicked and movie_title:
-            # 显示实时生成区域
-            st.markdown("---")
-            st.markdown("### 🤖 AI正在为您生成影评...")
-            
-            # 创建状态显示区域
-            status_container = st.container()
-            with status_container:
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    step_text = st.empty()
-                with col2:
-                    time_elapsed = st.empty()
-                
-                # 保存UI元素到session state
-                st.session_state.progress_bar = progress_bar
-                st.session_state.status_text = status_text
-                st.session_state.step_text = step_text
-                st.session_state.time_elapsed = time_elapsed
-            
-            # 风格映射
-            style_mapping = {
-                "专业学术": "professional",
-                "轻松休闲": "casual", 
-                "学术分析": "academic",
-                "娱乐导向": "entertaining",
-                "简洁明了": "brief"
-            }
-            
-            # 开始计时
-            start_time = time.time()
+        # 创建状态显示区域
+        status_container = st.container()
+        with status_container:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+            with col2:
+                time_elapsed = st.empty()
             
-            # 生成影评（实时显示进度）
-            review_data = generate_review(
-                movie_title,
-                None,  # 年份由TMDB自动确定
-                target_audience=target_audience,
-                review_style=style_mapping.get(review_style, "professional"),
-                max_length=max_length,
-                include_spoilers=include_spoilers
-            )
+            # 保存UI元素到session state
+            st.session_state.progress_bar = progress_bar
+            st.session_state.status_text = status_text
+            st.session_state.time_elapsed = time_elapsed
+        
+        # 开始计时
+        start_time = time.time()
+        
+        # 生成影评（实时显示进度）
+        generate = stream_review if stream_output else generate_review
+        review_data = generate_review_cached(generate, regenerate=regenerate, **search_params)
+        
+        # 清理状态显示
+        status_container.empty()
+        
+        if review_data:
+            # 计算总用时
+            total_time = time.time() - start_time
             
-            # 清理状态显示
-            status_container.empty()
+            # 保存到历史记录
+            st.session_state.current_review = review_data
+            st.session_state.current_params = search_params
+            st.session_state.review_history.appendleft({
+                # key区分历史条目（控件key用），id指向影评全文；相同影评多次出现时id相同
+                "key": uuid.uuid4().hex,
+                "id": save_review(review_data),
+                "title": review_data.get("title"),
+                "year": review_data.get("year"),
+                "rating": review_data.get("rating"),
+                "generated_at": review_data.get("generated_at", ""),
+                "search_params": search_params
+            })
             
-            if review_data:
-                # 计算总用时
-                total_time = time.time() - start_time
-                
-                # 显示完成信息
-                st.success(f"🎉 影评生成完成！用时 {total_time:.1f} 秒")
-                
-                # 保存到历史记录
-                st.session_state.current_review = review_data
-                st.session_state.review_history.insert(0, {
-                    **review_data,
-                    "search_params": {
-                        "title": movie_title,
-                        "year": None,
-                        "target_audience": target_audience
-                    }
-                })
-                
-                # 显示庆祝效果
-                st.balloons()
-            else:
-                st.error("❌ 生成失败，请重试")
-        
-        # 显示当前影评
-        if st.session_state.get('current_review'):
+            # 整页重跑以刷新历史记录，完成提示在重跑后显示
+            st.session_state.generation_notice = total_time
+            st.rerun()
+        else:
+            st.error("❌ 生成失败，请重试")
+    
+    # 显示完成信息
+    total_time = st.session_state.pop('generation_notice', None)
+    if total_time is not None:
+        st.success(f"🎉 影评生成完成！用时 {total_time:.1f} 秒")
+    
+    # 显示当前影评（放在占位容器中，重新生成时原地清空）
+    result_slot = st.empty()
+    if st.session_state.get('current_review'):
+        with result_slot.container():
+            if st.session_state.get('current_movie'):
+                display_movie_info(st.session_state.current_movie)
             display_review(st.session_state.current_review)
             
             # 操作按钮
@@ -494,100 +902,201 @@ def main():
             
             with col2:
                 if st.button("💾 保存到文件", use_container_width=True):
-                    # 保存功能
-                    filename = f"{st.session_state.current_review['title']}_review.txt"
+                    # 由后端在后台写盘，页面无需等待磁盘IO；返回时文件可能尚未写完
                     try:
-                        with open(filename, 'w', encoding='utf-8') as f:
-                            f.write(f"电影: {st.session_state.current_review['title']}\n")
-                            f.write(f"年份: {st.session_state.current_review.get('year', '未知')}\n")
-                            f.write(f"生成时间: {st.session_state.current_review['generated_at']}\n")
-                            f.write("=" * 50 + "\n\n")
-                            f.write(st.session_state.current_review['review'])
-                        st.success(f"已保存到 {filename}")
+                        path = save_review_file(st.session_state.current_review)
+                        st.success(f"已提交保存，文件将写入 {path}")
                     except Exception as e:
                         st.error(f"保存失败: {e}")
             
             with col3:
                 if st.button("🔄 重新生成", use_container_width=True):
                     st.session_state.current_review = None
-                    st.rerun()
+                    result_slot.empty()
+                    # 下次重跑时用同样的参数跳过缓存重新生成
+                    if st.session_state.get('current_params'):
+                        st.session_state.regenerate_params = st.session_state.current_params
+                        st.rerun()
+
+
+@st.fragment
+def _render_history_row(idx: int, review: Dict[str, Any]):
+    """渲染单条历史记录，只有展开时才构建详情内容"""
+    row_key = f"row_open_{review['key']}"
+    st.session_state.setdefault(row_key, False)
     
-    with tab2:
-        st.header("📊 历史影评记录")
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.markdown(f"**{idx+1}. 《{review['title']}》**")
+    with col2:
+        is_open = st.toggle("展开", key=row_key)
+    
+    if not is_open:
+        return
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.write(f"**电影**: {review['title']}")
+        if review['year']:
+            st.write(f"**年份**: {review['year']}")
+        st.write(f"**生成时间**: {review['generated_at'][:19]}")
+    
+    with col2:
+        if st.button("查看详情", key=f"detail_{review['key']}"):
+            full_review = get_review_by_id(review["id"])
+            if full_review is None:
+                st.warning("该影评已过期，请重新生成")
+            else:
+                st.session_state.current_review = full_review
+                st.session_state.current_params = review["search_params"]
+                st.rerun()
+
+def regenerate_history():
+    """用一次批量请求重新生成全部历史影评，并原位更新历史记录"""
+    history = st.session_state.review_history
+    items = [dict(entry["search_params"], year=entry["year"]) for entry in history]
+    
+    with st.spinner(f"正在重新生成 {len(items)} 篇影评..."):
+        try:
+            reviews = generate_reviews_batch(items, regenerate=True)
+        except httpx.HTTPStatusError as e:
+            st.error(f"批量生成失败: {e.response.text}")
+            return
+        except Exception as e:
+            st.error(f"请求失败: {e}")
+            return
+    
+    cache = _review_result_cache()
+    for entry, review_data in zip(history, reviews):
+        if review_data is None or review_data.get("confidence_level") == "错误":
+            st.warning(f"《{entry['title']}》重新生成失败，已保留原影评")
+            continue
         
-        if not st.session_state.review_history:
-            st.info("暂无历史记录，开始生成第一篇影评吧！")
-        else:
-            for idx, review in enumerate(st.session_state.review_history):
-                with st.expander(f"{idx+1}. 《{review['title']}》"):
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        st.write(f"**电影**: {review['title']}")
-                        if review['year']:
-                            st.write(f"**年份**: {review['year']}")
-                        st.write(f"**生成时间**: {review['generated_at'][:19]}")
-                    
-                    with col2:
-                        if st.button("查看详情", key=f"detail_{idx}"):
-                            st.session_state.current_review = review
-                            st.rerun()
+        entry.update(
+            id=save_review(review_data),
+            rating=review_data.get("rating"),
+            generated_at=review_data.get("generated_at", "")
+        )
+        # 用与生成页相同的键（搜索时的参数，年份为None）替换缓存中过时的影评，电影信息沿用原缓存
+        key = review_cache_key(**entry["search_params"])
+        cached = cache.get(key)
+        if cached is None:
+            payload = _review_disk_cache().get(_disk_cache_key(key))
+            cached = orjson.loads(payload) if payload is not None else None
+        _cache_review_result(key, review_data, cached[1] if cached else None)
     
-    with tab3:
-        st.header("⚙️ 个性化设置")
+    st.success("历史影评已全部重新生成")
+
+
+@st.fragment
+def tab_history():
+    """历史记录标签页"""
+    st.header("📊 历史影评记录")
+    
+    if not st.session_state.review_history:
+        st.info("暂无历史记录，开始生成第一篇影评吧！")
+    else:
+        if st.button("🔄 全部重新生成", use_container_width=True):
+            regenerate_history()
         
-        st.subheader("API配置")
+        for idx, review in enumerate(st.session_state.review_history):
+            _render_history_row(idx, review)
+
+
+@st.fragment
+def tab_settings():
+    """设置标签页"""
+    st.header("⚙️ 个性化设置")
+    
+    st.subheader("API配置")
+    with st.form("settings_form", clear_on_submit=False):
         col1, col2 = st.columns(2)
         with col1:
-            kimi_key = st.text_input("Kimi API Key", type="password", value=os.getenv("KIMI_API_KEY", ""))
+            kimi_key = st.text_input("Kimi API Key", type="password", value=load_config()["KIMI_API_KEY"])
         with col2:
-            tmdb_key = st.text_input("TMDB API Key", type="password", value=os.getenv("TMDB_API_KEY", ""))
+            tmdb_key = st.text_input("TMDB API Key", type="password", value=load_config()["TMDB_API_KEY"])
         
-        if st.button("💾 保存配置", use_container_width=True):
-            # 更新环境变量
-            os.environ["KIMI_API_KEY"] = kimi_key
-            os.environ["TMDB_API_KEY"] = tmdb_key
-            st.success("配置已保存（重启后生效）")
-        
-        st.subheader("界面偏好")
-        col1, col2 = st.columns(2)
-        with col1:
-            theme = st.selectbox("界面主题", ["现代简约", "商务专业", "清新自然"])
-        with col2:
-            language = st.selectbox("界面语言", ["中文简体", "中文繁体", "English"])
+        saved = st.form_submit_button("💾 保存配置", use_container_width=True)
     
-    with tab4:
-        st.header("ℹ️ 关于系统")
-        
-        st.markdown("""
-        ### 🎬 智能影评系统 v2.0
-        
-        **核心功能：**
-        - 🤖 AI智能分析电影内容
-        - ✍️ 生成专业级影评
-        - 🎯 个性化推荐
-        
-        **技术特点：**
-        - **AI引擎**: 基于Kimi大模型
-        - **数据支持**: TMDB电影数据库
-        - **界面框架**: Streamlit现代界面
-        - **响应速度**: 30-45秒/篇影评
-        
-        **使用指南：**
-        1. 在首页输入电影名称
-        2. 可选：设置年份和偏好
-        3. 点击搜索，等待AI生成
-        4. 查看、保存或分享影评
-        
-        **注意事项：**
-        - 首次加载可能需要额外时间
-        - 网络状况会影响响应速度
-        - 建议一次只生成一篇影评
-        """)
-        
-        st.info("💡 **提示**: 系统会记住您的偏好设置，下次使用更加便捷")
+    if saved:
+        # 更新环境变量
+        os.environ["KIMI_API_KEY"] = kimi_key
+        os.environ["TMDB_API_KEY"] = tmdb_key
+        load_config().update(KIMI_API_KEY=kimi_key, TMDB_API_KEY=tmdb_key)
+        st.success("配置已保存（重启后生效）")
     
+    st.subheader("缓存")
+    if st.button("🗑️ 清除电影信息缓存"):
+        _search_movies_cached.clear()
+        _popular_movies_cached.clear()
+        st.success("电影信息缓存已清除")
     
-  
+    st.subheader("界面偏好")
+    col1, col2 = st.columns(2)
+    with col1:
+        theme = st.selectbox("界面主题", ["现代简约", "商务专业", "清新自然"])
+    with col2:
+        language = st.selectbox("界面语言", ["中文简体", "中文繁体", "English"])
+
+
+def tab_about():
+    """关于标签页"""
+    st.header("ℹ️ 关于系统")
+    
+    st.markdown("""
+    ### 🎬 智能影评系统 v2.0
+    
+    **核心功能：**
+    - 🤖 AI智能分析电影内容
+    - ✍️ 生成专业级影评
+    - 🎯 个性化推荐
+    
+    **技术特点：**
+    - **AI引擎**: 基于Kimi大模型
+    - **数据支持**: TMDB电影数据库
+    - **界面框架**: Streamlit现代界面
+    - **响应速度**: 30-45秒/篇影评
+    
+    **使用指南：**
+    1. 在首页输入电影名称
+    2. 可选：设置年份和偏好
+    3. 点击搜索，等待AI生成
+    4. 查看、保存或分享影评
+    
+    **注意事项：**
+    - 首次加载可能需要额外时间
+    - 网络状况会影响响应速度
+    - 建议一次只生成一篇影评
+    """)
+    
+    st.info("💡 **提示**: 系统会记住您的偏好设置，下次使用更加便捷")
+
+
+def main():
+    """主应用"""
+    inject_css()
+    init_session_state()
+    
+    # 主标题
+    st.markdown('<h1 class="app-title">🎬 电影影评智能Agent</h1>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666; margin-bottom: 2rem;">基于AI的智能影评生成系统 - 让每一部电影都有专业解读</p>', unsafe_allow_html=True)
+    
+    # 创建标签页
+    tab1, tab2, tab3, tab4 = st.tabs(["🏠 首页", "📊 历史记录", "⚙️ 设置", "ℹ️ 关于"])
+    
+    with tab1:
+        tab_generate()
+    
+    with tab2:
+        tab_history()
+    
+    with tab3:
+        tab_settings()
+    
+    with tab4:
+        tab_about()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
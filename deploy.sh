@@ -125,7 +125,7 @@ dev_mode() {
     
     # 启动FastAPI服务
     echo "启动FastAPI服务..."
-    python3 -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload &
+    python3 -m uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload &
     FASTAPI_PID=$!
     
     # 等待FastAPI服务启动
@@ -3,13 +3,22 @@
 """
 
 import os
+import orjson
 import asyncio
+import logging
+import aiohttp
 from typing import List, Optional
+from datetime import datetime
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from collections import OrderedDict
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 import uvicorn
 from dotenv import load_dotenv
@@ -17,6 +26,8 @@ import time
 import uuid
 
 from src.agents.movie_review_agent import MovieReviewAgent
+from src.services.task_store import TaskStore
+from src.utils.text_processor import WHITESPACE_TRANS
 from src.models.review_models import (
     ReviewRequest, 
     ReviewResponse, 
@@ -35,23 +46,75 @@ class GenerationStatus(BaseModel):
     estimated_time_left: Optional[int] = None
     result: Optional[ReviewResponse] = None
     error: Optional[str] = None
+    version: int = 0  # 每次状态更新递增，供长轮询判断是否有新状态
 
 # 加载环境变量
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # 全局变量
 review_agent = None
-review_tasks = {}
+# 按创建顺序保存任务状态，超过MAX_TASKS时淘汰最早的任务
+review_tasks: "OrderedDict[str, GenerationStatus]" = OrderedDict()
+# 已结束任务的结束时间（task_id -> time.monotonic()），供后台清理过期任务
+review_task_finished = {}
+# 任务状态变更通知：每次更新时触发当前Event并换上新的Event
+review_task_events = {}
+# 已排队、尚未发出的状态通知（task_id -> TimerHandle）
+review_task_flushes = {}
+# 配置REDIS_URL时，任务状态快照同步写入Redis，其他worker或重启后仍可查询
+task_store = None
+# 后台写入任务的引用，避免被垃圾回收
+_pending_writes = set()
+# 各任务尚未写入的最新快照（task_id -> (快照, 是否为新建)），以及正在写入快照的任务；
+# 同一任务同时只有一个写入协程按顺序写入，新快照覆盖尚未写出的旧快照，旧状态不会晚于新状态落盘
+_pending_snapshots = {}
+_snapshot_writers = set()
+
+# 同一任务的状态通知合并窗口（秒），窗口内的多次更新只推送一次最新状态
+STATUS_COALESCE_INTERVAL = 0.1
+
+# 进程内最多保留的任务数，以及已结束任务的保留时间和清理间隔（秒）
+MAX_TASKS = int(os.getenv("MAX_TASKS", "1024"))
+FINISHED_TASK_TTL = 60 * 60
+TASK_SWEEP_INTERVAL = 300
+
+# 状态长轮询的最长挂起时间（秒）
+LONG_POLL_MAX_WAIT = 25
+
+# 影评文件保存目录
+REVIEW_SAVE_DIR = os.getenv("REVIEW_SAVE_DIR", "data/reviews")
+
+# 批量生成时同时进行的影评数，避免瞬间压垮上游接口
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# 所有批量请求共用，限制的是整个进程内同时生成的影评数
+batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+# SSE保活间隔（秒）
+SSE_PING_INTERVAL = 21
+WS_HEARTBEAT_INTERVAL = 5
+
+# 流式输出时合并token的时间窗口（秒），避免逐token发送
+STREAM_FLUSH_INTERVAL = 0.08
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    global review_agent
+    global review_agent, task_store
     
     # 启动时初始化Agent
     kimi_api_key = os.getenv("KIMI_API_KEY")
     tmdb_api_key = os.getenv("TMDB_API_KEY")
+    # 整个进程共享一个HTTP会话，复用到上游的连接（keep-alive），DNS结果缓存5分钟；
+    # 单次请求限时，避免上游卡住时占满连接池
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=100, limit_per_host=30, keepalive_timeout=75, ttl_dns_cache=300
+        ),
+        timeout=aiohttp.ClientTimeout(total=15)
+    )
     
     if not kimi_api_key or not tmdb_api_key:
         print("警告: API密钥未配置，请检查.env文件")
@@ -59,14 +122,23 @@ async def lifespan(app: FastAPI):
     else:
         review_agent = MovieReviewAgent(
             kimi_api_key=kimi_api_key,
-            tmdb_api_key=tmdb_api_key
+            tmdb_api_key=tmdb_api_key,
+            http_session=http_session
         )
     
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        task_store = TaskStore(redis_url, ttl=int(os.getenv("TASK_TTL", "3600")))
+    
+    sweeper = asyncio.create_task(_sweep_tasks())
+    
     yield
     
     # 关闭时清理资源
-    if review_agent:
-        pass  # 可以在这里添加清理逻辑
+    sweeper.cancel()
+    await http_session.close()
+    if task_store:
+        await task_store.close()
 
 
 # 创建FastAPI应用
@@ -74,7 +146,8 @@ app = FastAPI(
     title="电影影评智能Agent",
     description="基于LangChain的电影影评生成系统",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # 添加CORS中间件
@@ -86,6 +159,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """gzip压缩响应，但跳过流式接口：gzip会缓冲数据，导致增量内容不能及时下发"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/api/review/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# 影评正文等文本JSON压缩率高，超过500字节的响应启用gzip
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=500)
+
 # 静态文件服务
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -122,13 +208,14 @@ async def generate_review(request: ReviewRequest):
     task_id = str(uuid.uuid4())
     
     # 初始化任务状态
-    review_tasks[task_id] = GenerationStatus(
+    _register_task(GenerationStatus(
         task_id=task_id,
         status="pending",
         progress=0,
         message="正在初始化...",
         current_step="初始化"
-    )
+    ))
+    _queue_snapshot(task_id, create=True)
     
     # 在后台启动任务
     asyncio.create_task(_generate_review_with_progress(task_id, request))
@@ -136,60 +223,173 @@ async def generate_review(request: ReviewRequest):
     return {"task_id": task_id, "message": "影评生成已开始"}
 
 
+def _register_task(task: GenerationStatus):
+    """登记新任务，超出MAX_TASKS时淘汰最早创建的任务"""
+    review_tasks[task.task_id] = task
+    review_tasks.move_to_end(task.task_id)
+    review_task_events[task.task_id] = asyncio.Event()
+    while len(review_tasks) > MAX_TASKS:
+        oldest_id, _ = review_tasks.popitem(last=False)
+        _drop_task(oldest_id)
+
+
+def _drop_task(task_id: str):
+    """清理任务的通知状态（任务本身需已从review_tasks移除），并唤醒仍在等待的订阅者"""
+    review_task_finished.pop(task_id, None)
+    handle = review_task_flushes.pop(task_id, None)
+    if handle is not None:
+        handle.cancel()
+    event = review_task_events.pop(task_id, None)
+    if event is not None:
+        event.set()
+
+
+async def _sweep_tasks():
+    """定期移除结束超过FINISHED_TASK_TTL的任务"""
+    while True:
+        await asyncio.sleep(TASK_SWEEP_INTERVAL)
+        cutoff = time.monotonic() - FINISHED_TASK_TTL
+        expired = [task_id for task_id, finished in review_task_finished.items() if finished < cutoff]
+        for task_id in expired:
+            review_tasks.pop(task_id, None)
+            _drop_task(task_id)
+
+
+def _update_task(task_id: str, **fields):
+    """更新任务状态，并在合并窗口结束时唤醒等待该任务的订阅者"""
+    task = review_tasks.get(task_id)
+    if task is None:
+        # 任务已被淘汰，后台生成的结果直接丢弃
+        return
+    for name, value in fields.items():
+        setattr(task, name, value)
+    task.version += 1
+    
+    # 终态立即推送；中间状态在窗口内合并，订阅者被唤醒时读到的总是最新状态
+    if task.status in ("completed", "error"):
+        review_task_finished[task_id] = time.monotonic()
+        handle = review_task_flushes.pop(task_id, None)
+        if handle is not None:
+            handle.cancel()
+        _notify_task(task_id)
+    elif task_id not in review_task_flushes:
+        review_task_flushes[task_id] = asyncio.get_running_loop().call_later(
+            STATUS_COALESCE_INTERVAL, _notify_task, task_id
+        )
+
+
+def _task_snapshot(task: GenerationStatus) -> bytes:
+    """序列化任务状态"""
+    return orjson.dumps(jsonable_encoder(task))
+
+
+def _write_in_background(coro):
+    """在后台执行存储写入，不阻塞状态更新"""
+    task = asyncio.create_task(coro)
+    _pending_writes.add(task)
+    task.add_done_callback(_on_write_done)
+
+
+def _on_write_done(task: asyncio.Task):
+    """后台写入结束：释放引用，失败时记录日志"""
+    _pending_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("任务状态写入失败: %s", task.exception())
+
+
+def _queue_snapshot(task_id: str, create: bool = False):
+    """把任务当前状态排入写入队列，该任务没有写入协程时启动一个"""
+    if not task_store or task_id not in review_tasks:
+        return
+    pending = _pending_snapshots.get(task_id)
+    # 新建写入尚未执行时保留新建标记，保证任务ID仍会记入最近任务列表
+    create = create or (pending is not None and pending[1])
+    _pending_snapshots[task_id] = (_task_snapshot(review_tasks[task_id]), create)
+    if task_id not in _snapshot_writers:
+        _snapshot_writers.add(task_id)
+        _write_in_background(_flush_snapshots(task_id))
+
+
+async def _flush_snapshots(task_id: str):
+    """依次写出任务的最新快照，直到没有新的快照"""
+    try:
+        while task_id in _pending_snapshots:
+            snapshot, create = _pending_snapshots.pop(task_id)
+            try:
+                if create:
+                    await task_store.create(task_id, snapshot)
+                else:
+                    await task_store.save(task_id, snapshot)
+            except Exception as e:
+                logger.error("任务%s状态写入失败: %s", task_id, e)
+    finally:
+        _snapshot_writers.discard(task_id)
+
+
+async def _get_task(task_id: str) -> Optional[GenerationStatus]:
+    """读取任务状态：优先进程内，其次Redis快照"""
+    task = review_tasks.get(task_id)
+    if task is None and task_store:
+        snapshot = await task_store.load(task_id)
+        if snapshot is not None:
+            task = GenerationStatus(**orjson.loads(snapshot))
+    return task
+
+
+def _notify_task(task_id: str):
+    """触发当前Event并换上新的Event，同时写入状态快照"""
+    review_task_flushes.pop(task_id, None)
+    _queue_snapshot(task_id)
+    event = review_task_events.get(task_id)
+    if event is not None:
+        review_task_events[task_id] = asyncio.Event()
+        event.set()
+
+
 async def _generate_review_with_progress(task_id: str, request: ReviewRequest):
     """带进度更新的影评生成"""
     try:
-        task = review_tasks[task_id]
-        
         # 步骤1: 获取电影信息
-        task.status = "processing"
-        task.progress = 10
-        task.current_step = "搜索电影信息"
-        task.message = f"正在搜索《{request.title}》的电影信息..."
+        _update_task(
+            task_id,
+            status="processing",
+            progress=10,
+            current_step="搜索电影信息",
+            message=f"正在搜索《{request.title}》的电影信息..."
+        )
         
         movie_info = await review_agent._get_movie_info(request.title, request.year)
         
         # 步骤2: 收集评论和上下文
-        task.progress = 25
-        task.current_step = "收集观众评论"
-        task.message = "正在收集TMDB观众评论..."
+        _update_task(task_id, progress=25, current_step="收集观众评论", message="正在收集TMDB观众评论...")
         
         context = await review_agent._collect_context(movie_info, request)
         
         # 步骤3: 情感分析
-        task.progress = 40
-        task.current_step = "情感分析"
-        task.message = "正在分析评论情感倾向..."
+        # 情感分析结果已在收集上下文时一并算出（context["sentiment_analysis"]）
+        _update_task(task_id, progress=40, current_step="情感分析", message="正在分析评论情感倾向...")
         
-        if context.get("existing_reviews"):
-            sentiments = [review_agent.sentiment_analyzer.analyze(review["content"]) 
-                         for review in context["existing_reviews"][:10]]
-            
         # 步骤4: 计算评分
-        task.progress = 55
-        task.current_step = "计算评分"
-        task.message = "基于评论计算客观评分..."
+        _update_task(task_id, progress=55, current_step="计算评分", message="基于评论计算客观评分...")
         
         rating = await review_agent._calculate_rating(movie_info, context)
         
         # 步骤5: 生成影评内容
-        task.progress = 70
-        task.current_step = "生成影评"
-        task.message = "AI正在撰写专业影评..."
+        _update_task(task_id, progress=70, current_step="生成影评", message="AI正在撰写专业影评...")
         
+        # 任务状态只推送进度，不带已生成的文本（每帧重发全文，数据量随长度平方增长）；
+        # 需要实时显示文本时客户端改用 /api/review/stream 的增量输出
         review_content = await review_agent._generate_review_content(movie_info, context, request)
         
         # 步骤6: 最终处理
-        task.progress = 90
-        task.current_step = "最终处理"
-        task.message = "正在完善细节..."
+        _update_task(task_id, progress=90, current_step="最终处理", message="正在完善细节...")
         
         # 计算字数统计
-        word_count = len(review_content.replace(' ', '').replace('\\n', ''))
+        word_count = len(review_content.translate(WHITESPACE_TRANS))
         
         # 创建响应
-        from datetime import datetime
-        response = ReviewResponse(
+        # 字段均由本服务生成，跳过校验直接构造
+        response = ReviewResponse.model_construct(
             title=movie_info.title,
             year=movie_info.year,
             rating=rating,
@@ -201,43 +401,194 @@ async def _generate_review_with_progress(task_id: str, request: ReviewRequest):
         )
         
         # 完成
-        task.progress = 100
-        task.status = "completed"
-        task.current_step = "完成"
-        task.message = "影评生成完成！"
-        task.result = response
+        _update_task(
+            task_id,
+            progress=100,
+            status="completed",
+            current_step="完成",
+            message="影评生成完成！",
+            result=response
+        )
         
     except Exception as e:
         # 错误处理
-        task.status = "error"
-        task.current_step = "错误"
-        task.message = f"生成失败: {str(e)}"
-        task.error = str(e)
+        _update_task(
+            task_id,
+            status="error",
+            current_step="错误",
+            message=f"生成失败: {str(e)}",
+            error=str(e)
+        )
 
 
-@app.get("/api/review/status/{task_id}")
-async def get_review_status(task_id: str):
-    """获取影评生成状态"""
+@app.get("/api/review/stream/{task_id}")
+async def stream_review_status(task_id: str):
+    """以SSE推送影评生成状态，状态变化时立即发送"""
     if task_id not in review_tasks:
         raise HTTPException(
             status_code=404,
             detail="任务不存在"
         )
     
-    return review_tasks[task_id]
+    async def event_gen():
+        while True:
+            # 先取Event再读状态，避免错过两者之间的更新
+            event = review_task_events.get(task_id)
+            task = review_tasks.get(task_id)
+            if task is None:
+                return
+            
+            yield f"data: {orjson.dumps(jsonable_encoder(task)).decode()}\n\n"
+            if task.status in ("completed", "error") or event is None:
+                return
+            
+            while True:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=SSE_PING_INTERVAL)
+                    break
+                except asyncio.TimeoutError:
+                    yield ":ping\n\n"
+    
+    return StreamingResponse(
+        event_gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/review/{task_id}")
+async def websocket_review_status(websocket: WebSocket, task_id: str):
+    """以WebSocket推送影评生成状态，空闲时定期发送心跳"""
+    await websocket.accept()
+    if task_id not in review_tasks:
+        await websocket.close(code=4404, reason="任务不存在")
+        return
+    
+    try:
+        while True:
+            # 先取Event再读状态，避免错过两者之间的更新
+            event = review_task_events.get(task_id)
+            task = review_tasks.get(task_id)
+            if task is None:
+                break
+            
+            await websocket.send_text(orjson.dumps({"type": "status", "data": jsonable_encoder(task)}).decode())
+            if task.status in ("completed", "error") or event is None:
+                break
+            
+            while True:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=WS_HEARTBEAT_INTERVAL)
+                    break
+                except asyncio.TimeoutError:
+                    await websocket.send_text('{"type":"ping"}')
+        
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+@app.post("/api/review/stream")
+async def stream_review(request: ReviewRequest):
+    """流式生成影评 - 以NDJSON逐行返回进度、文本增量和最终结果"""
+    if not review_agent:
+        raise HTTPException(
+            status_code=503,
+            detail="Agent服务未初始化，请检查API密钥配置"
+        )
+    
+    def _line(payload: dict) -> str:
+        return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE).decode()
+    
+    async def event_stream():
+        try:
+            yield _line({"event": "status", "progress": 10, "message": f"正在搜索《{request.title}》的电影信息..."})
+            movie_info = await review_agent._get_movie_info(request.title, request.year)
+            yield _line({"event": "movie", "movie": jsonable_encoder(movie_info)})
+            
+            yield _line({"event": "status", "progress": 30, "message": "正在收集TMDB观众评论..."})
+            context = await review_agent._collect_context(movie_info, request)
+            rating = await review_agent._calculate_rating(movie_info, context)
+            
+            yield _line({"event": "status", "progress": 50, "message": "AI正在撰写专业影评..."})
+            chunks = []
+            pending = []
+            last_flush = time.monotonic()
+            async for delta in review_agent._stream_review_content(movie_info, context, request):
+                chunks.append(delta)
+                pending.append(delta)
+                if time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL:
+                    yield _line({"delta": "".join(pending)})
+                    pending.clear()
+                    last_flush = time.monotonic()
+            if pending:
+                yield _line({"delta": "".join(pending)})
+            
+            review_content = "".join(chunks)
+            # 字段均由本服务生成，跳过校验直接构造
+            response = ReviewResponse.model_construct(
+                title=movie_info.title,
+                year=movie_info.year,
+                rating=rating,
+                review=review_content,
+                sources=context.get("sources", []),
+                generated_at=datetime.now(),
+                word_count=len(review_content.translate(WHITESPACE_TRANS)),
+                review_style=request.review_style
+            )
+            yield _line({"event": "result", "progress": 100, "result": jsonable_encoder(response)})
+        except Exception as e:
+            yield _line({"event": "error", "error": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/review/status/{task_id}")
+async def get_review_status(task_id: str, wait: float = 0, since: Optional[int] = None):
+    """
+    获取影评生成状态
+    
+    传入since（上次拿到的version）和wait时为长轮询：状态未变化时最多挂起wait秒，
+    有更新立即返回。
+    """
+    # 先取Event再读状态，避免错过两者之间的更新
+    event = review_task_events.get(task_id)
+    task = await _get_task(task_id)
+    if task is None:
+        raise HTTPException(
+            status_code=404,
+            detail="任务不存在"
+        )
+    
+    if wait > 0 and since is not None and task.version == since and task.status not in ("completed", "error"):
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(wait, LONG_POLL_MAX_WAIT))
+            except asyncio.TimeoutError:
+                pass
+            return review_tasks.get(task_id, task)
+        
+        # 其他worker上的任务无法订阅通知，间隔一秒后重新读取快照
+        await asyncio.sleep(min(wait, 1))
+        return await _get_task(task_id) or task
+    
+    return task
 
 
 @app.get("/api/review/result/{task_id}", response_model=ReviewResponse)
 async def get_review_result(task_id: str):
     """获取影评生成结果"""
-    if task_id not in review_tasks:
+    task = await _get_task(task_id)
+    if task is None:
         raise HTTPException(
             status_code=404,
             detail="任务不存在"
         )
     
-    task = review_tasks[task_id]
-    
     if task.status != "completed":
         raise HTTPException(
             status_code=400,
@@ -247,6 +598,33 @@ async def get_review_result(task_id: str):
     return task.result
 
 
+@app.post("/api/review/save")
+async def save_review_file(review: ReviewResponse, background_tasks: BackgroundTasks):
+    """保存影评为文本文件，写盘在响应返回后于后台线程中进行"""
+    # 标题中的路径分隔符等字符不能出现在文件名里
+    safe_title = "".join(c if c.isalnum() or c in " -_" else "_" for c in review.title).strip() or "untitled"
+    filename = f"{safe_title}_review.txt"
+    path = os.path.abspath(os.path.join(REVIEW_SAVE_DIR, filename))
+    background_tasks.add_task(_write_review_file, path, review)
+    # 响应返回时文件尚未写入，只表示保存已排队
+    return {"filename": filename, "path": path, "message": "影评保存已排队"}
+
+
+def _write_review_file(path: str, review: ReviewResponse):
+    """将影评写入文件（同步函数，由BackgroundTasks放到线程池执行）"""
+    # 响应已经返回，写入失败无法再告知调用方，只能记录日志
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"电影: {review.title}\n")
+            f.write(f"年份: {review.year or '未知'}\n")
+            f.write(f"生成时间: {review.generated_at.isoformat()}\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(review.review)
+    except Exception as e:
+        logger.error("影评文件写入失败（%s）: %s", path, e)
+
+
 @app.post("/api/review/batch", response_model=BatchReviewResponse)
 async def generate_batch_reviews(request: BatchReviewRequest):
     """批量生成影评"""
@@ -257,11 +635,32 @@ async def generate_batch_reviews(request: BatchReviewRequest):
         )
     
     try:
-        reviews = []
+        # 并发处理所有请求，同时进行的数量受信号量限制
+        async def _bounded(movie: ReviewRequest) -> ReviewResponse:
+            async with batch_semaphore:
+                return await review_agent.generate_review(movie)
         
-        # 异步处理所有请求
-        tasks = [review_agent.generate_review(movie) for movie in request.movies]
-        reviews = await asyncio.gather(*tasks)
+        # 同一批次中参数相同的电影只生成一次，结果按原顺序复用到每个位置
+        keys = [_batch_movie_key(movie) for movie in request.movies]
+        unique = dict(zip(keys, request.movies))
+        unique_results = await asyncio.gather(
+            *[_bounded(movie) for movie in unique.values()],
+            return_exceptions=True
+        )
+        result_map = dict(zip(unique.keys(), unique_results))
+        results = [result_map[key] for key in keys]
+        
+        # 单部电影失败不影响整批，失败项单独返回；
+        # generate_review内部出错时不抛异常，而是返回confidence_level为"错误"的结果，同样计入失败
+        reviews = []
+        failures = []
+        for index, (movie, result) in enumerate(zip(request.movies, results)):
+            if isinstance(result, Exception):
+                failures.append({"index": index, "title": movie.title, "error": str(result)})
+            elif result.confidence_level == "错误":
+                failures.append({"index": index, "title": movie.title, "error": result.review})
+            else:
+                reviews.append(result)
         
         # 生成对比分析（如果需要）
         comparison_analysis = None
@@ -271,8 +670,9 @@ async def generate_batch_reviews(request: BatchReviewRequest):
         return BatchReviewResponse(
             reviews=reviews,
             comparison_analysis=comparison_analysis,
-            generated_at=__import__('datetime').datetime.now(),
-            total_movies=len(reviews)
+            generated_at=datetime.now(),
+            total_movies=len(reviews),
+            failures=failures
         )
     except Exception as e:
         raise HTTPException(
@@ -281,6 +681,12 @@ async def generate_batch_reviews(request: BatchReviewRequest):
         )
 
 
+def _batch_movie_key(movie: ReviewRequest) -> tuple:
+    """批量请求去重键：标题忽略大小写和首尾空白，其余生成参数需完全一致"""
+    options = movie.dict(exclude={"title", "focus_areas"})
+    return (movie.title.strip().lower(), tuple(movie.focus_areas), *options.values())
+
+
 @app.get("/api/search")
 async def search_movies(query: str, year: Optional[int] = None):
     """搜索电影信息"""
@@ -291,12 +697,9 @@ async def search_movies(query: str, year: Optional[int] = None):
         )
     
     try:
-        from src.services.tmdb_service import TMDBService
-        tmdb_service = TMDBService(os.getenv("TMDB_API_KEY"))
-        
-        async with tmdb_service:
-            movie_info = await tmdb_service.search_movie(query, year)
-            return movie_info.dict()
+        # 复用Agent的TMDB服务及其共享会话
+        movie_info = await review_agent.tmdb_service.search_movie(query, year)
+        return movie_info.dict()
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -314,12 +717,8 @@ async def get_popular_movies(page: int = 1):
         )
     
     try:
-        from src.services.tmdb_service import TMDBService
-        tmdb_service = TMDBService(os.getenv("TMDB_API_KEY"))
-        
-        async with tmdb_service:
-            movies = await tmdb_service.get_popular_movies(page)
-            return [movie.dict() for movie in movies]
+        movies = await review_agent.tmdb_service.get_popular_movies(page)
+        return [movie.dict() for movie in movies]
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -332,30 +731,48 @@ async def _generate_comparison_analysis(reviews: List[ReviewResponse]) -> str:
     if not reviews:
         return ""
     
-    # 简单的对比分析逻辑
-    ratings = [review.rating for review in reviews]
-    avg_rating = sum(ratings) / len(ratings)
-    
-    best_movie = max(reviews, key=lambda r: r.rating)
-    worst_movie = min(reviews, key=lambda r: r.rating)
+    # ReviewResponse不可哈希，只取分析用到的字段作为缓存键
+    entries = tuple(
+        (review.title, review.rating, getattr(review, 'review', '')[:200])
+        for review in reviews
+    )
+    return _comparison_analysis_cached(entries)
+
+
+@lru_cache(maxsize=256)
+def _comparison_analysis_cached(entries: tuple) -> str:
+    """根据 (标题, 评分, 影评摘录) 元组生成对比分析，相同批次直接复用结果"""
+    # 一次遍历同时求总分和最高/最低分；严格比较保证并列时取第一个，与max/min一致
+    best = worst = entries[0]
+    total = 0.0
+    for entry in entries:
+        rating = entry[1]
+        total += rating
+        if rating > best[1]:
+            best = entry
+        if rating < worst[1]:
+            worst = entry
+    avg_rating = total / len(entries)
     
-    analysis = f"""
-## 电影对比分析
-
-本次分析了{len(reviews)}部电影，平均评分为{avg_rating:.1f}/10。
-
-**最佳推荐**：《{best_movie.title}》(评分：{best_movie.rating}/10)
-{getattr(best_movie, 'review', '')[:200]}...
-
-**相对较弱**：《{worst_movie.title}》(评分：{worst_movie.rating}/10)
-{getattr(worst_movie, 'review', '')[:200]}...
-
-**总结**：
-- 最佳影片比最差影片高出{abs(best_movie.rating - worst_movie.rating):.1f}分
-- 整体质量{('较高' if avg_rating >= 7 else '中等' if avg_rating >= 5 else '偏低')}
-"""
+    best_title, best_rating, best_excerpt = best
+    worst_title, worst_rating, worst_excerpt = worst
+    quality = '较高' if avg_rating >= 7 else '中等' if avg_rating >= 5 else '偏低'
     
-    return analysis.strip()
+    return "\n".join([
+        "## 电影对比分析",
+        "",
+        f"本次分析了{len(entries)}部电影，平均评分为{avg_rating:.1f}/10。",
+        "",
+        f"**最佳推荐**：《{best_title}》(评分：{best_rating}/10)",
+        f"{best_excerpt}...",
+        "",
+        f"**相对较弱**：《{worst_title}》(评分：{worst_rating}/10)",
+        f"{worst_excerpt}...",
+        "",
+        "**总结**：",
+        f"- 最佳影片比最差影片高出{abs(best_rating - worst_rating):.1f}分",
+        f"- 整体质量{quality}",
+    ])
 
 
 if __name__ == "__main__":
@@ -363,11 +780,14 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     debug = os.getenv("DEBUG", "false").lower() == "true"
     
+    # 任务状态保存在进程内存中，只能单worker运行；事件循环和HTTP解析使用C实现
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
         reload=debug,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
         access_log=True
     )
\ No newline at end of file
@@ -6,59 +6,80 @@
 import os
 import json
 import asyncio
-from typing import Dict, List, Optional, Any
+import hashlib
+from typing import Dict, List, Optional, Any, AsyncIterator
 from datetime import datetime
 
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.schema import SystemMessage, HumanMessage
+from langchain.schema import SystemMessage, HumanMessage, BaseMessage
 from langchain.agents import Tool, AgentExecutor, create_openai_functions_agent
-from langchain.memory import ConversationBufferMemory
 from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_community.utilities import WikipediaAPIWrapper
 
 from ..services.tmdb_service import TMDBService
-from ..services.sentiment_analyzer import SentimentAnalyzer
+from ..services.sentiment_analyzer import get_sentiment_analyzer, score_distribution
 from ..models.review_models import MovieInfo, ReviewRequest, ReviewResponse
-from ..utils.text_processor import TextProcessor
+from ..utils.text_processor import TextProcessor, WHITESPACE_TRANS
+from ..utils.cache import LRUCache
+
+
+# 相同提示词的影评缓存；修改系统提示词或模型配置时递增LLM_CACHE_VERSION使旧缓存失效
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_VERSION = os.getenv("LLM_CACHE_VERSION", "1")
+LLM_CACHE_TTL = 24 * 60 * 60
+
+# 遇到429限流、5xx或超时时由OpenAI SDK按指数退避重试，并遵循响应的Retry-After
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+# 同时进行的LLM请求数，超出的请求排队等待，避免集中触发RPM/TPM限流
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
 
 
 class MovieReviewAgent:
     """智能电影影评Agent"""
     
-    def __init__(self, kimi_api_key: str, tmdb_api_key: str):
+    def __init__(self, kimi_api_key: str, tmdb_api_key: str, http_session=None):
+        """
+        Args:
+            kimi_api_key: Kimi API密钥
+            tmdb_api_key: TMDB API密钥
+            http_session: 共享的aiohttp会话，所有TMDB请求复用其连接池
+        """
         self.llm = ChatOpenAI(
             model="moonshot-v1-8k",
             temperature=0.7,
             openai_api_key=kimi_api_key,
-            openai_api_base="https://api.moonshot.cn/v1"
+            openai_api_base="https://api.moonshot.cn/v1",
+            max_retries=LLM_MAX_RETRIES
         )
+        self._llm_gate = asyncio.Semaphore(LLM_CONCURRENCY)
         
-        self.tmdb_service = TMDBService(tmdb_api_key)
-        self.sentiment_analyzer = SentimentAnalyzer()
+        self.sentiment_analyzer = get_sentiment_analyzer()
+        self.tmdb_service = TMDBService(
+            tmdb_api_key, session=http_session, sentiment_analyzer=self.sentiment_analyzer
+        )
+        self._llm_cache = LRUCache(maxsize=512, ttl=LLM_CACHE_TTL)
         self.text_processor = TextProcessor()
         self.search = DuckDuckGoSearchRun()
         self.wikipedia = WikipediaAPIWrapper()
         
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
-        
         self.tools = self._setup_tools()
         self.agent = self._create_agent()
     
     def _setup_tools(self) -> List[Tool]:
         """设置Agent工具"""
         return [
+            # 异步工具通过coroutine注册，在事件循环中调用时不会再套一层asyncio.run
             Tool(
                 name="search_movie_info",
                 func=lambda x: asyncio.run(self._search_movie_info(x)),
+                coroutine=self._search_movie_info,
                 description="搜索电影基本信息，包括剧情、导演、演员、评分等"
             ),
             Tool(
                 name="search_reviews",
                 func=lambda x: asyncio.run(self._search_existing_reviews(x)),
+                coroutine=self._search_existing_reviews,
                 description="搜索现有影评和用户评价"
             ),
             Tool(
@@ -66,18 +87,28 @@ class MovieReviewAgent:
                 func=self._analyze_sentiment,
                 description="分析文本情感倾向"
             ),
+            # 同步的网络搜索在异步调用时放到线程中执行
             Tool(
                 name="search_web",
                 func=self.search.run,
+                coroutine=self._run_in_thread(self.search.run),
                 description="网络搜索获取最新信息"
             ),
             Tool(
                 name="wikipedia_search",
                 func=self.wikipedia.run,
+                coroutine=self._run_in_thread(self.wikipedia.run),
                 description="搜索维基百科获取背景信息"
             )
         ]
     
+    @staticmethod
+    def _run_in_thread(func):
+        """将阻塞函数包装为在线程池中执行的协程函数"""
+        async def _wrapper(*args, **kwargs):
+            return await asyncio.to_thread(func, *args, **kwargs)
+        return _wrapper
+    
     def _create_agent(self):
         """创建LangChain Agent"""
         system_prompt = """你是一个专业的电影评论家，能够基于多方面信息生成真实、客观、有深度的影评。
@@ -99,7 +130,6 @@ class MovieReviewAgent:
         
         prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content=system_prompt),
-            MessagesPlaceholder(variable_name="chat_history"),
             HumanMessage(content="{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad")
         ])
@@ -126,7 +156,7 @@ class MovieReviewAgent:
             rating = await self._calculate_rating(movie_info, context)
             
             # 计算字数统计
-            word_count = len(review_content.replace(' ', '').replace('\n', ''))
+            word_count = len(review_content.translate(WHITESPACE_TRANS))
             
             # 提取评分分解信息
             tmdb_reviews = context.get("tmdb_reviews", {})
@@ -135,7 +165,8 @@ class MovieReviewAgent:
             sentiment_distribution = tmdb_reviews.get("sentiment_distribution", {})
             review_count = tmdb_reviews.get("review_count", 0)
             
-            return ReviewResponse(
+            # 字段均由本方法生成，跳过校验直接构造
+            return ReviewResponse.model_construct(
                 title=movie_info.title,
                 year=movie_info.year,
                 rating=rating,
@@ -151,7 +182,7 @@ class MovieReviewAgent:
             )
             
         except Exception as e:
-            return ReviewResponse(
+            return ReviewResponse.model_construct(
                 title=request.title,
                 year=request.year,
                 rating=0.0,
@@ -168,8 +199,7 @@ class MovieReviewAgent:
     
     async def _get_movie_info(self, title: str, year: Optional[int] = None) -> MovieInfo:
         """获取电影详细信息"""
-        async with self.tmdb_service as service:
-            return await service.search_movie(title, year)
+        return await self.tmdb_service.search_movie(title, year)
     
     async def _collect_context(self, movie_info: MovieInfo, request: ReviewRequest) -> Dict[str, Any]:
         """收集分析上下文"""
@@ -185,46 +215,39 @@ class MovieReviewAgent:
         }
         
         try:
-            # 获取TMDB评论和评分
-            if hasattr(movie_info, 'id') or movie_info.title:
-                # 尝试通过标题搜索获取电影ID
-                async with self.tmdb_service as service:
-                    try:
-                        # 重新搜索获取完整信息（包含ID）
-                        full_movie_info = await service.search_movie(movie_info.title, movie_info.year)
-                        if hasattr(full_movie_info, 'id') and full_movie_info.id:
-                            # 获取基于评论的评分
-                            review_rating = await service.calculate_review_based_rating(full_movie_info.id)
-                            context["tmdb_reviews"] = review_rating
-                            
-                            # 获取TMDB评论作为现有评论
-                            tmdb_reviews = await service.get_movie_reviews(full_movie_info.id)
-                            context["existing_reviews"] = [
-                                {"content": review.get("content", ""), "author": review.get("author", "")}
-                                for review in tmdb_reviews[:20]  # 取前20条评论
-                            ]
-                    except Exception as e:
-                        print(f"获取TMDB评论失败: {e}")
+            # TMDB评论/评分与文化背景搜索互不依赖，并发获取
+            (review_rating, tmdb_reviews), cultural_info = await asyncio.gather(
+                self._fetch_tmdb_reviews(movie_info),
+                self._search_cultural_context(movie_info)
+            )
+            context["tmdb_reviews"] = review_rating
+            context["existing_reviews"] = [
+                {"content": review.get("content", ""), "author": review.get("author", "")}
+                for review in tmdb_reviews[:20]  # 取前20条评论
+            ]
+            context["cultural_context"] = cultural_info
+            
+            # TMDB评论在计算评分时已逐条分析过，直接复用分数
+            sentiments = review_rating.get("review_sentiments", [])[:10]
             
             # 如果没有TMDB评论，使用传统搜索
             if not context["existing_reviews"]:
                 reviews = await self._search_existing_reviews(movie_info.title)
                 context["existing_reviews"] = reviews
+                sentiments = self.sentiment_analyzer.batch_analyze(
+                    [review["content"] for review in reviews[:10]]
+                )
             
             # 情感分析
             if context["existing_reviews"]:
-                sentiments = [self.sentiment_analyzer.analyze(review["content"]) for review in context["existing_reviews"][:10]]
+                distribution = score_distribution(sentiments)
                 context["sentiment_analysis"] = {
-                    "positive": sum(1 for s in sentiments if s > 0.1),
-                    "neutral": sum(1 for s in sentiments if -0.1 <= s <= 0.1),
-                    "negative": sum(1 for s in sentiments if s < -0.1),
-                    "average_score": sum(sentiments) / len(sentiments) if sentiments else 0
+                    "positive": distribution["positive"],
+                    "neutral": distribution["neutral"],
+                    "negative": distribution["negative"],
+                    "average_score": distribution["average"]
                 }
             
-            # 搜索文化背景
-            cultural_info = await self._search_cultural_context(movie_info)
-            context["cultural_context"] = cultural_info
-            
         except Exception as e:
             print(f"收集上下文时出错: {e}")
             # 提供基础上下文，避免错误中断流程
@@ -236,33 +259,123 @@ class MovieReviewAgent:
         
         return context
     
-    async def _generate_review_content(self, movie_info: MovieInfo, context: Dict[str, Any], request: ReviewRequest) -> str:
-        """生成影评内容"""
-        
-        review_prompt = f"""
-        基于以下信息，为电影《{movie_info.title}》({movie_info.year})生成一篇专业影评：
-        
-        基本信息：
-        {json.dumps(movie_info.dict(), ensure_ascii=False, indent=2)}
+    async def _fetch_tmdb_reviews(self, movie_info: MovieInfo):
+        """获取TMDB评论评分和评论列表，返回 (评分数据, 评论列表)"""
+        service = self.tmdb_service
+        # movie_info来自_get_movie_info的TMDB搜索，已带ID；没有ID说明TMDB未匹配到
+        if not movie_info.id:
+            return {}, []
         
-        现有影评情感分析：
-        {json.dumps(context.get('sentiment_analysis', {}), ensure_ascii=False, indent=2)}
-        
-        文化背景：
-        {json.dumps(context.get('cultural_context', {}), ensure_ascii=False, indent=2)}
+        try:
+            # 评论只拉取一次，评分在本地基于同一批评论计算
+            reviews, review_rating = await service.fetch_reviews_with_breakdown(movie_info.id)
+            return review_rating, reviews
+        except Exception as e:
+            print(f"获取TMDB评论失败: {e}")
+            return {}, []
+    
+    # 提示词中只保留写影评用得到的电影字段
+    _PROMPT_MOVIE_FIELDS = {
+        'title', 'year', 'director', 'cast', 'genre', 'runtime', 'plot', 'rating', 'keywords'
+    }
+    
+    # 影评提示词模板只编译一次；固定的写作要求放在最前面，按请求变化的数据放在末尾，
+    # 便于上游对相同前缀做提示词缓存
+    _REVIEW_TEMPLATE = ChatPromptTemplate.from_messages([
+        ("system",
+         "你是一名专业影评人，请根据用户提供的电影信息撰写影评。\n"
+         "要求：\n"
+         "1. 从剧情、导演手法、演员表现、技术层面、主题深度等角度分析\n"
+         "2. 结合现有影评观点，但要保持独立判断\n"
+         "3. 语言生动但不浮夸，观点明确\n"
+         "4. 适合目标观众观看，字数不超过给定上限\n"
+         "请直接输出完整影评。"),
+        ("human",
+         "电影：《{title}》({year})\n"
+         "基本信息：{movie_json}\n"
+         "现有影评情感分析：{sentiment_json}\n"
+         "文化背景：{cultural_json}\n"
+         "目标观众：{audience}\n"
+         "字数上限：{max_length}字"),
+    ])
+    
+    @staticmethod
+    def _compact_json(data: Any) -> str:
+        """紧凑JSON（无缩进和多余空格），减少提示词token数"""
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    
+    def _build_review_prompt(self, movie_info: MovieInfo, context: Dict[str, Any],
+                             request: ReviewRequest) -> List[BaseMessage]:
+        """构建影评生成消息"""
+        movie_data = movie_info.dict(include=self._PROMPT_MOVIE_FIELDS, exclude_none=True)
+        # 情感得分保留三位小数，文化背景去掉空字段，避免无信息量的token
+        sentiment = {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in context.get('sentiment_analysis', {}).items()
+        }
+        cultural = {key: value for key, value in context.get('cultural_context', {}).items() if value}
+        return self._REVIEW_TEMPLATE.format_messages(
+            title=movie_info.title,
+            year=movie_info.year,
+            movie_json=self._compact_json(movie_data),
+            sentiment_json=self._compact_json(sentiment),
+            cultural_json=self._compact_json(cultural),
+            audience=request.target_audience or '普通观众',
+            max_length=request.max_length
+        )
+    
+    def _bounded_llm(self, request: ReviewRequest):
+        """限制LLM输出长度，避免单次生成耗时失控"""
+        max_tokens = request.max_output_tokens or request.max_length * 2
+        return self.llm.bind(max_tokens=max_tokens)
+    
+    def _llm_cache_key(self, messages: List[BaseMessage], request: ReviewRequest) -> Optional[str]:
+        """按提示消息和模型参数生成缓存键，缓存关闭时返回None"""
+        if not LLM_CACHE_ENABLED:
+            return None
+        max_tokens = request.max_output_tokens or request.max_length * 2
+        prompt = "\n".join(f"{message.type}:{message.content}" for message in messages)
+        material = f"{self.llm.model_name}|{self.llm.temperature}|{max_tokens}|{prompt}"
+        return f"llm:v{LLM_CACHE_VERSION}:" + hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+    
+    async def _generate_review_content(self, movie_info: MovieInfo, context: Dict[str, Any], request: ReviewRequest) -> str:
+        """生成影评内容（相同提示词直接返回缓存结果，request.regenerate时跳过缓存）"""
+        review_prompt = self._build_review_prompt(movie_info, context, request)
+        cache_key = self._llm_cache_key(review_prompt, request)
+        # 要求重新生成时不读缓存，新结果仍会写入并覆盖旧的缓存
+        if cache_key and not request.regenerate:
+            cached = self._llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        要求：
-        1. 从剧情、导演手法、演员表现、技术层面、主题深度等角度分析
-        2. 结合现有影评观点，但要保持独立判断
-        3. 语言生动但不浮夸，观点明确
-        4. 适合{request.target_audience or '普通观众'}观看
-        5. 字数在800-1200字之间
+        async with self._llm_gate:
+            response = await self._bounded_llm(request).ainvoke(review_prompt)
+        if cache_key and response.content:
+            self._llm_cache.set(cache_key, response.content)
+        return response.content
+    
+    async def _stream_review_content(self, movie_info: MovieInfo, context: Dict[str, Any],
+                                     request: ReviewRequest) -> AsyncIterator[str]:
+        """流式生成影评内容，逐块返回文本（命中缓存时一次返回全文）"""
+        review_prompt = self._build_review_prompt(movie_info, context, request)
+        cache_key = self._llm_cache_key(review_prompt, request)
+        # 要求重新生成时不读缓存，新结果仍会写入并覆盖旧的缓存
+        if cache_key and not request.regenerate:
+            cached = self._llm_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
         
-        请生成完整影评：
-        """
+        parts = []
+        async with self._llm_gate:
+            async for chunk in self._bounded_llm(request).astream(review_prompt):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
         
-        response = await self.llm.ainvoke(review_prompt)
-        return response.content
+        # 只缓存完整生成的内容
+        if cache_key and parts:
+            self._llm_cache.set(cache_key, "".join(parts))
     
     async def _calculate_rating(self, movie_info: MovieInfo, context: Dict[str, Any]) -> float:
         """计算综合评分 - 基于TMDB评论"""
@@ -314,7 +427,8 @@ class MovieReviewAgent:
         """搜索文化背景信息"""
         try:
             search_query = f"{movie_info.title} {movie_info.year} 文化背景 社会影响"
-            search_results = self.search.run(search_query)
+            # 搜索为同步网络请求，放到线程中执行以免阻塞事件循环
+            search_results = await asyncio.to_thread(self.search.run, search_query)
             
             return {
                 "cultural_significance": search_results[:500],
@@ -4,11 +4,14 @@
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MovieInfo(BaseModel):
     """电影基本信息"""
+    # 构建后只读，TMDB搜索缓存可直接返回同一实例
+    model_config = ConfigDict(frozen=True)
+
     id: Optional[int] = Field(None, description="TMDB电影ID")
     title: str = Field(..., description="电影标题")
     year: Optional[int] = Field(None, description="上映年份")
@@ -38,7 +41,9 @@ class ReviewRequest(BaseModel):
     focus_areas: List[str] = Field(default_factory=list, description="重点关注领域")
     language: str = Field("zh", description="输出语言")
     max_length: int = Field(1000, description="最大字数")
+    max_output_tokens: Optional[int] = Field(None, description="LLM最大输出token数")
     include_spoilers: bool = Field(False, description="是否包含剧透")
+    regenerate: bool = Field(False, description="跳过已缓存的生成结果，重新生成")
 
 
 class ReviewResponse(BaseModel):
@@ -97,6 +102,7 @@ class BatchReviewResponse(BaseModel):
     comparison_analysis: Optional[str] = Field(None, description="对比分析")
     generated_at: datetime = Field(..., description="生成时间")
     total_movies: int = Field(..., description="总电影数")
+    failures: List[Dict[str, Any]] = Field(default_factory=list, description="生成失败的电影（index、title、error）")
 
 
 class ErrorResponse(BaseModel):
@@ -4,13 +4,56 @@
 """
 
 import os
+import orjson
+import asyncio
+import hashlib
 import openai
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 import re
 import logging
+from collections import Counter
+from itertools import chain, islice
+
+from ..utils.cache import DiskCache, LRUCache
+from ..utils.keyword_matcher import KeywordMatcher
+from .sentiment_analyzer import score_distribution
 
 logger = logging.getLogger(__name__)
 
+# 批量分析时每次请求最多包含的文本条数和字符数，避免超出模型上下文
+BATCH_SIZE = 16
+DETAILED_BATCH_SIZE = 8
+BATCH_MAX_CHARS = 6000
+# 单条文本在批量提示词中的最大长度
+BATCH_TEXT_MAX_CHARS = 1000
+# 异步批量分析时同时进行的请求数
+ASYNC_CONCURRENCY = 8
+
+# 模型有时会把JSON包在markdown代码块中
+_CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# 分析结果的持久化缓存（SQLite），相同文本不再重复请求；默认关闭，设置路径后启用
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "")
+SENTIMENT_CACHE_TTL = 30 * 24 * 60 * 60
+# 修改提示词或解析逻辑时递增，使旧缓存失效
+SENTIMENT_PROMPT_VERSION = "1"
+
+# API不可用时备选词典分析使用的情感词
+FALLBACK_POSITIVE_WORDS = frozenset({
+    '好', '棒', '优秀', '精彩', '出色', '喜欢', '推荐', '经典', '震撼', '感动',
+    '好看', '不错', '给力', '完美', '优秀', '卓越', '杰出', '令人惊叹',
+    '精彩绝伦', '引人入胜', '感人至深', '回味无穷', '值得一看'
+})
+
+FALLBACK_NEGATIVE_WORDS = frozenset({
+    '差', '烂', '糟糕', '失望', '无聊', '难看', '垃圾', '浪费时间', '后悔',
+    '差评', '不行', '不好', '失望', '无语', '无力吐槽', '毁三观',
+    '烂片', '雷人', '狗血', '老套', '俗套', '尴尬', '出戏'
+})
+
+_FALLBACK_MATCHER = KeywordMatcher(FALLBACK_POSITIVE_WORDS | FALLBACK_NEGATIVE_WORDS)
+
+
 class KimiSentimentAnalyzer:
     """基于Kimi API的情感分析器"""
     
@@ -23,11 +66,68 @@ class KimiSentimentAnalyzer:
             api_key=self.api_key,
             base_url=self.base_url
         )
+        # 异步客户端用于并发请求，连接池在多次调用间复用
+        self.aclient = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url
+        )
         
         # Kimi API参数限制
         self.temperature = 0.3  # 推荐值，避免使用0
         self.max_tokens = 1000
         self.model = "moonshot-v1-8k"  # Kimi支持的模型
+        
+        # 两级缓存：进程内LRU优先，其次SQLite持久化缓存
+        self._memory_cache = LRUCache(maxsize=4096)
+        self._cache = None
+        if SENTIMENT_CACHE_PATH:
+            try:
+                self._cache = DiskCache(os.path.expanduser(SENTIMENT_CACHE_PATH), ttl=SENTIMENT_CACHE_TTL)
+            except Exception as e:
+                logger.error(f"情感分析缓存不可用: {e}")
+    
+    def _cache_key(self, kind: str, text: str) -> str:
+        """缓存键：模型、提示词版本、分析类型和文本共同决定"""
+        material = f"{self.model}|{SENTIMENT_PROMPT_VERSION}|{kind}|{text}"
+        return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+    
+    def _cache_get(self, kind: str, text: str) -> Any:
+        """读取缓存的分析结果，未命中返回None"""
+        key = self._cache_key(kind, text)
+        value = self._memory_cache.get(key)
+        if value is None and self._cache is not None:
+            raw = self._cache.get(key)
+            if raw is not None:
+                value = orjson.loads(raw)
+                self._memory_cache.set(key, value)
+        # 详细结果是dict，返回副本以免调用方修改缓存内容
+        return dict(value) if isinstance(value, dict) else value
+    
+    async def _acache_get(self, kind: str, text: str) -> Any:
+        """_cache_get的异步版本：进程内未命中时在线程中读取SQLite，不阻塞事件循环"""
+        if self._cache is None or self._cache_key(kind, text) in self._memory_cache:
+            return self._cache_get(kind, text)
+        return await asyncio.to_thread(self._cache_get, kind, text)
+    
+    def _cache_set(self, kind: str, text: str, value: Any, deferred: Optional[list] = None):
+        """
+        写入分析结果（只缓存API成功返回的结果）
+        
+        Args:
+            deferred: 异步路径传入的列表，持久化缓存的写入先收集到其中，由_persist在线程中一次写入
+        """
+        key = self._cache_key(kind, text)
+        self._memory_cache.set(key, dict(value) if isinstance(value, dict) else value)
+        if self._cache is not None:
+            if deferred is None:
+                self._cache.set(key, orjson.dumps(value))
+            else:
+                deferred.append((key, orjson.dumps(value)))
+    
+    async def _persist(self, deferred: list):
+        """在线程中把收集到的结果一次写入持久化缓存"""
+        if deferred and self._cache is not None:
+            await asyncio.to_thread(self._cache.set_many, deferred)
     
     def analyze(self, text: str) -> float:
         """
@@ -42,8 +142,43 @@ class KimiSentimentAnalyzer:
         if not text or not text.strip():
             return 0.0
         
+        cached = self._cache_get("score", text)
+        if cached is not None:
+            return cached
+        
         try:
-            prompt = f"""
+            response = self.client.chat.completions.create(**self._score_request(text))
+            return self._accept_score(text, response.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"Kimi情感分析失败: {e}")
+            return 0.0
+    
+    async def analyze_async(self, text: str) -> float:
+        """analyze的异步版本"""
+        deferred = []
+        score = await self._analyze_async(text, deferred)
+        await self._persist(deferred)
+        return score
+    
+    async def _analyze_async(self, text: str, deferred: list) -> float:
+        """异步分析单条文本，持久化缓存的写入收集到deferred"""
+        if not text or not text.strip():
+            return 0.0
+        
+        cached = await self._acache_get("score", text)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.aclient.chat.completions.create(**self._score_request(text))
+            return self._accept_score(text, response.choices[0].message.content, deferred)
+        except Exception as e:
+            logger.error(f"Kimi情感分析失败: {e}")
+            return 0.0
+    
+    def _score_request(self, text: str) -> Dict[str, Any]:
+        """单条文本情感分数的请求参数"""
+        prompt = f"""
             请分析以下文本的情感倾向，并给出一个-1.0到1.0的情感分数：
             -1.0表示极度负面，1.0表示极度正面，0.0表示中性
             
@@ -51,29 +186,24 @@ class KimiSentimentAnalyzer:
             
             请仅返回一个数字，不要添加其他解释。
             """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=10,
-                n=1  # Kimi API要求temperature=0.3时n必须为1
-            )
-            
-            # 解析返回的情感分数
-            result = response.choices[0].message.content.strip()
-            try:
-                score = float(result)
-                return max(-1.0, min(1.0, score))  # 确保在范围内
-            except ValueError:
-                logger.error(f"无法解析Kimi返回的情感分数: {result}")
-                return 0.0
-                
-        except Exception as e:
-            logger.error(f"Kimi情感分析失败: {e}")
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "max_tokens": 10,
+            "n": 1  # Kimi API要求temperature=0.3时n必须为1
+        }
+    
+    def _accept_score(self, text: str, content: str, deferred: Optional[list] = None) -> float:
+        """解析返回的情感分数，解析成功时写入缓存"""
+        result = content.strip()
+        try:
+            score = max(-1.0, min(1.0, float(result)))  # 确保在范围内
+        except ValueError:
+            logger.error(f"无法解析Kimi返回的情感分数: {result}")
             return 0.0
+        self._cache_set("score", text, score, deferred)
+        return score
     
     def analyze_detailed(self, text: str) -> Dict[str, Any]:
         """
@@ -95,6 +225,10 @@ class KimiSentimentAnalyzer:
                 "explanation": ""
             }
         
+        cached = self._cache_get("detailed", text)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""
             请对以下文本进行详细的情感分析，返回JSON格式：
@@ -122,15 +256,14 @@ class KimiSentimentAnalyzer:
                 n=1
             )
             
-            import json
             result = response.choices[0].message.content.strip()
             
-            # 清理可能的markdown格式
-            result = result.replace('```json', '').replace('```', '').strip()
+            # 清理可能的markdown代码块标记
+            result = _CODE_FENCE_RE.sub('', result)
             
             try:
-                analysis = json.loads(result)
-                return {
+                analysis = orjson.loads(result)
+                detailed = {
                     "sentiment_score": float(analysis.get("sentiment_score", 0.0)),
                     "sentiment": analysis.get("sentiment", "neutral"),
                     "keywords": analysis.get("keywords", []),
@@ -138,7 +271,9 @@ class KimiSentimentAnalyzer:
                     "confidence": float(analysis.get("confidence", 0.0)),
                     "explanation": analysis.get("explanation", "")
                 }
-            except json.JSONDecodeError:
+                self._cache_set("detailed", text, detailed)
+                return detailed
+            except orjson.JSONDecodeError:
                 logger.error(f"无法解析Kimi返回的JSON: {result}")
                 return self._fallback_analysis(text)
                 
@@ -148,23 +283,11 @@ class KimiSentimentAnalyzer:
     
     def _fallback_analysis(self, text: str) -> Dict[str, Any]:
         """Kimi API失败时的备选方案"""
-        # 使用简单的基于词典的方法
-        positive_words = {
-            '好', '棒', '优秀', '精彩', '出色', '喜欢', '推荐', '经典', '震撼', '感动',
-            '好看', '不错', '给力', '完美', '优秀', '卓越', '杰出', '令人惊叹',
-            '精彩绝伦', '引人入胜', '感人至深', '回味无穷', '值得一看'
-        }
-        
-        negative_words = {
-            '差', '烂', '糟糕', '失望', '无聊', '难看', '垃圾', '浪费时间', '后悔',
-            '差评', '不行', '不好', '失望', '无语', '无力吐槽', '毁三观',
-            '烂片', '雷人', '狗血', '老套', '俗套', '尴尬', '出戏'
-        }
-        
-        # 简单分析
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        # 使用简单的基于词典的方法，一次扫描找出所有情感词
+        hits = _FALLBACK_MATCHER.first_positions(text.lower())
+        # 命中词与两个词典求交集即得各自的命中数，不逐词判断
+        positive_count = len(hits.keys() & FALLBACK_POSITIVE_WORDS)
+        negative_count = len(hits.keys() & FALLBACK_NEGATIVE_WORDS)
         
         total = positive_count + negative_count
         if total == 0:
@@ -175,15 +298,226 @@ class KimiSentimentAnalyzer:
         return {
             "sentiment_score": score,
             "sentiment": "positive" if score > 0.1 else "negative" if score < -0.1 else "neutral",
-            "keywords": [word for word in (positive_words | negative_words) if word in text_lower][:5],
+            "keywords": list(islice(hits, 5)),
             "intensity": abs(score),
             "confidence": 0.5,
             "explanation": "基于词典的简单分析"
         }
     
+    @staticmethod
+    def _chunks(texts: List[str], size: int) -> Iterator[List[int]]:
+        """按条数和字符预算切分批次，返回每批文本的下标"""
+        batch, chars = [], 0
+        for i, text in enumerate(texts):
+            length = min(len(text), BATCH_TEXT_MAX_CHARS)
+            if batch and (len(batch) >= size or chars + length > BATCH_MAX_CHARS):
+                yield batch
+                batch, chars = [], 0
+            batch.append(i)
+            chars += length
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def _batched_prompt(texts: List[str], fmt: str = "score") -> str:
+        """将多条文本编号拼入一个提示词，要求按编号返回JSON结果"""
+        numbered = "\n".join(
+            f"{i}. {orjson.dumps(text[:BATCH_TEXT_MAX_CHARS]).decode()}"
+            for i, text in enumerate(texts, 1)
+        )
+        if fmt == "score":
+            schema = '{"results": [每条文本的情感分数，-1.0到1.0之间的数字]}'
+        else:
+            schema = (
+                '{"results": [{"sentiment_score": -1.0到1.0, "sentiment": "positive|negative|neutral", '
+                '"keywords": ["关键词"], "intensity": 0.0到1.0, "confidence": 0.0到1.0, '
+                '"explanation": "简要解释"}]}'
+            )
+        return (
+            "请分析以下每条文本的情感倾向，-1.0表示极度负面，1.0表示极度正面，0.0表示中性。\n"
+            f"共{len(texts)}条文本：\n{numbered}\n\n"
+            f"请按编号顺序返回JSON，results中的元素与文本一一对应：{schema}"
+        )
+    
+    def _batch_request(self, texts: List[str], fmt: str, max_tokens: int) -> Dict[str, Any]:
+        """一批文本的请求参数"""
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": self._batched_prompt(texts, fmt)}],
+            "temperature": self.temperature,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"},
+            "n": 1
+        }
+    
+    @staticmethod
+    def _parse_batch_reply(content: str, expected: int) -> Optional[list]:
+        """解析批量结果，数量与请求不一致时返回None"""
+        results = orjson.loads(_CODE_FENCE_RE.sub('', content.strip())).get("results")
+        if not isinstance(results, list) or len(results) != expected:
+            logger.error(f"Kimi批量返回结果数量不匹配: 期望{expected}条")
+            return None
+        return results
+    
+    def _complete_batch(self, texts: List[str], fmt: str, max_tokens: int) -> Optional[list]:
+        """一次请求分析一批文本，返回与texts等长的结果列表，失败时返回None"""
+        try:
+            response = self.client.chat.completions.create(**self._batch_request(texts, fmt, max_tokens))
+            return self._parse_batch_reply(response.choices[0].message.content, len(texts))
+        except Exception as e:
+            logger.error(f"Kimi批量情感分析失败: {e}")
+            return None
+    
+    async def _acomplete_batch(self, texts: List[str], fmt: str, max_tokens: int) -> Optional[list]:
+        """_complete_batch的异步版本"""
+        try:
+            response = await self.aclient.chat.completions.create(**self._batch_request(texts, fmt, max_tokens))
+            return self._parse_batch_reply(response.choices[0].message.content, len(texts))
+        except Exception as e:
+            logger.error(f"Kimi批量情感分析失败: {e}")
+            return None
+    
+    @staticmethod
+    def _to_score(result: Any) -> Optional[float]:
+        """批量结果中的单条分数，无法解析时返回None"""
+        try:
+            return max(-1.0, min(1.0, float(result)))
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _to_detailed(result: Any) -> Optional[Dict[str, Any]]:
+        """批量结果中的单条详细分析，无法解析时返回None"""
+        try:
+            return {
+                "sentiment_score": float(result.get("sentiment_score", 0.0)),
+                "sentiment": result.get("sentiment", "neutral"),
+                "keywords": result.get("keywords", []),
+                "intensity": float(result.get("intensity", 0.0)),
+                "confidence": float(result.get("confidence", 0.0)),
+                "explanation": result.get("explanation", "")
+            }
+        except (AttributeError, TypeError, ValueError):
+            return None
+    
+    def _accept_detailed(self, text: str, result: Any, deferred: Optional[list] = None) -> Dict[str, Any]:
+        """采用批量结果中的单条详细分析并写入缓存，无法解析时使用词典分析"""
+        detailed = self._to_detailed(result)
+        if detailed is None:
+            return self._fallback_analysis(text)
+        self._cache_set("detailed", text, detailed, deferred)
+        return detailed
+    
+    def _pending_texts(self, texts: List[str], kind: str, results: list) -> tuple:
+        """
+        找出需要请求的文本：空文本跳过，重复文本只请求一次，缓存命中的结果直接填入results
+        
+        Returns:
+            (每条待请求文本在texts中的全部下标, 去重后的待请求文本)
+        """
+        positions = {}
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                positions.setdefault(text, []).append(i)
+        
+        indexed, pending = [], []
+        for text, group in positions.items():
+            cached = self._cache_get(kind, text)
+            if cached is not None:
+                self._fill(results, group, cached)
+            else:
+                indexed.append(group)
+                pending.append(text)
+        return indexed, pending
+    
+    async def _apending_texts(self, texts: List[str], kind: str, results: list) -> tuple:
+        """_pending_texts的异步版本：启用持久化缓存时整批查询放到线程中执行"""
+        if self._cache is None:
+            return self._pending_texts(texts, kind, results)
+        return await asyncio.to_thread(self._pending_texts, texts, kind, results)
+    
+    @staticmethod
+    def _fill(results: list, group: List[int], value: Any):
+        """将同一文本的结果写回它出现的每个位置，详细结果各持一份副本"""
+        results[group[0]] = value
+        for i in group[1:]:
+            results[i] = dict(value) if isinstance(value, dict) else value
+    
     def batch_analyze(self, texts: List[str]) -> List[float]:
-        """批量分析情感倾向"""
-        return [self.analyze(text) for text in texts]
+        """批量分析情感倾向，每批文本合并为一次请求"""
+        scores = [0.0] * len(texts)
+        indexed, pending = self._pending_texts(texts, "score", scores)
+        
+        for batch in self._chunks(pending, BATCH_SIZE):
+            batch_texts = [pending[j] for j in batch]
+            results = self._complete_batch(batch_texts, "score", max_tokens=10 * len(batch_texts) + 20)
+            for j, text, result in zip(batch, batch_texts, results or [None] * len(batch_texts)):
+                score = self._to_score(result)
+                if score is None:
+                    # 整批失败或单条无法解析时退回逐条请求
+                    score = self.analyze(text)
+                else:
+                    self._cache_set("score", text, score)
+                self._fill(scores, indexed[j], score)
+        
+        return scores
+    
+    async def batch_analyze_async(self, texts: List[str], concurrency: int = ASYNC_CONCURRENCY) -> List[float]:
+        """batch_analyze的异步版本，各批次并发请求"""
+        scores = [0.0] * len(texts)
+        indexed, pending = await self._apending_texts(texts, "score", scores)
+        semaphore = asyncio.Semaphore(concurrency)
+        deferred = []
+        
+        async def _run(batch: List[int]):
+            batch_texts = [pending[j] for j in batch]
+            async with semaphore:
+                results = await self._acomplete_batch(batch_texts, "score", max_tokens=10 * len(batch_texts) + 20)
+            for j, text, result in zip(batch, batch_texts, results or [None] * len(batch_texts)):
+                score = self._to_score(result)
+                if score is None:
+                    async with semaphore:
+                        score = await self._analyze_async(text, deferred)
+                else:
+                    self._cache_set("score", text, score, deferred)
+                self._fill(scores, indexed[j], score)
+        
+        await asyncio.gather(*(_run(batch) for batch in self._chunks(pending, BATCH_SIZE)))
+        await self._persist(deferred)
+        return scores
+    
+    def batch_analyze_detailed(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """批量详细情感分析，每批文本合并为一次请求"""
+        # 空文本直接得到中性结果，其余位置由批量结果填充
+        detailed = [None if text and text.strip() else self.analyze_detailed(text) for text in texts]
+        indexed, pending = self._pending_texts(texts, "detailed", detailed)
+        
+        for batch in self._chunks(pending, DETAILED_BATCH_SIZE):
+            batch_texts = [pending[j] for j in batch]
+            results = self._complete_batch(batch_texts, "detailed", max_tokens=200 * len(batch_texts))
+            for j, text, result in zip(batch, batch_texts, results or [None] * len(batch_texts)):
+                self._fill(detailed, indexed[j], self._accept_detailed(text, result))
+        
+        return detailed
+    
+    async def batch_analyze_detailed_async(self, texts: List[str],
+                                           concurrency: int = ASYNC_CONCURRENCY) -> List[Dict[str, Any]]:
+        """batch_analyze_detailed的异步版本，各批次并发请求"""
+        detailed = [None if text and text.strip() else self.analyze_detailed(text) for text in texts]
+        indexed, pending = await self._apending_texts(texts, "detailed", detailed)
+        semaphore = asyncio.Semaphore(concurrency)
+        deferred = []
+        
+        async def _run(batch: List[int]):
+            batch_texts = [pending[j] for j in batch]
+            async with semaphore:
+                results = await self._acomplete_batch(batch_texts, "detailed", max_tokens=200 * len(batch_texts))
+            for j, text, result in zip(batch, batch_texts, results or [None] * len(batch_texts)):
+                self._fill(detailed, indexed[j], self._accept_detailed(text, result, deferred))
+        
+        await asyncio.gather(*(_run(batch) for batch in self._chunks(pending, DETAILED_BATCH_SIZE)))
+        await self._persist(deferred)
+        return detailed
     
     def analyze_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
         """分析一组影评"""
@@ -196,15 +530,9 @@ class KimiSentimentAnalyzer:
                 "summary": "无评论数据"
             }
         
-        sentiments = []
-        detailed_results = []
-        
-        for review in reviews:
-            content = review.get('content', '')
-            if content:
-                detailed = self.analyze_detailed(content)
-                sentiments.append(detailed['sentiment_score'])
-                detailed_results.append(detailed)
+        contents = [review.get('content', '') for review in reviews]
+        detailed_results = self.batch_analyze_detailed([content for content in contents if content])
+        sentiments = [detailed['sentiment_score'] for detailed in detailed_results]
         
         if not sentiments:
             return {
@@ -215,32 +543,24 @@ class KimiSentimentAnalyzer:
                 "summary": "无有效评论"
             }
         
-        # 计算情感分布
-        positive = sum(1 for s in sentiments if s > 0.1)
-        neutral = sum(1 for s in sentiments if -0.1 <= s <= 0.1)
-        negative = sum(1 for s in sentiments if s < -0.1)
+        # 情感分布和平均分一次统计
+        distribution = score_distribution(sentiments)
+        average = distribution["average"]
         
         # 提取关键词
-        all_keywords = []
-        for result in detailed_results:
-            all_keywords.extend(result.get('keywords', []))
-        
-        keyword_counts = {}
-        for keyword in all_keywords:
-            keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
-        
-        top_keywords = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        keyword_counts = Counter(chain.from_iterable(result.get('keywords', ()) for result in detailed_results))
+        top_keywords = keyword_counts.most_common(10)
         
         return {
-            "average_sentiment": sum(sentiments) / len(sentiments),
+            "average_sentiment": average,
             "sentiment_distribution": {
-                "positive": positive,
-                "neutral": neutral,
-                "negative": negative
+                "positive": distribution["positive"],
+                "neutral": distribution["neutral"],
+                "negative": distribution["negative"]
             },
             "keywords": [kw[0] for kw in top_keywords],
             "confidence": sum(r.get('confidence', 0.5) for r in detailed_results) / len(detailed_results),
-            "summary": f"共分析了{len(reviews)}条评论，整体情感倾向: {'正面' if sum(sentiments)/len(sentiments) > 0.1 else '负面' if sum(sentiments)/len(sentiments) < -0.1 else '中性'}",
+            "summary": f"共分析了{len(reviews)}条评论，整体情感倾向: {'正面' if average > 0.1 else '负面' if average < -0.1 else '中性'}",
             "detailed_results": detailed_results
         }
     
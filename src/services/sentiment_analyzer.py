@@ -3,8 +3,186 @@
 """
 
 from typing import Dict, List, Any
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
 import re
 import random
+import threading
+
+from ..utils.keyword_matcher import KeywordMatcher
+
+
+# 增强的情感词典 - 添加中英文情感词
+POSITIVE_KEYWORDS = frozenset({
+    # 中文情感词
+    '好', '棒', '精彩', '完美', '经典', '出色', '优秀', '感人', '震撼',
+    '好看', '不错', '喜欢', '推荐', '值得', '满意', '开心', '快乐',
+    '享受', '自然', '真实', '生动', '紧凑', '巧妙', '用心',
+    '爱', '最爱', '最佳', '杰作', '神作', '超赞', '牛逼', '厉害',
+    '优美', '深刻', '精彩绝伦', '无与伦比', '叹为观止', '拍手叫好',
+    '过瘾', '爽', '美丽', '华丽', '精致', '精彩纷呈',
+    # 强烈中文情感词
+    '太精彩了', '真的很好', '非常精彩', '特别棒', '强烈推荐', '太棒了',
+    '非常好', '特别精彩', '非常棒', '太赞了', '真的很棒', '非常出色',
+    '极为精彩', '相当精彩', '极为出色', '非常优秀', '特别优秀',
+    # 英文情感词
+    'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'brilliant',
+    'perfect', 'masterpiece', 'superb', 'outstanding', 'magnificent',
+    'beautiful', 'love', 'loved', 'best', 'incredible', 'awesome',
+    'good', 'nice', 'enjoyed', 'enjoyable', 'impressed', 'impressive',
+    'touching', 'moving', 'powerful', 'strong', 'remarkable',
+    # 强烈英文情感词
+    'really', 'very', 'highly', 'truly', 'genuinely',
+    'changed', 'life', 'greatest', 'ever', 'stand', 'time', 'test'
+})
+
+NEGATIVE_KEYWORDS = frozenset({
+    # 中文负面词
+    '差', '烂', '糟糕', '垃圾', '失望', '后悔', '无聊', '难看', '不行',
+    '不好', '一般', '普通', '尴尬', '做作', '夸张', '生硬', '老套',
+    '俗套', '拖沓', '混乱', '牵强', '空洞', '乏味', '单调',
+    '讨厌', '恶心', '垃圾片', '烂片', '看不下去',
+    '浪费时间', '毁三观', '催眠', '平庸', '拙劣', '粗糙', '低劣',
+    '无趣', '枯燥', '冗长', '松散', '混乱不堪',
+    # 强烈中文负面情感词
+    '真的很差', '非常糟糕', '特别差', '太烂了', '完全浪费时间', '非常失望',
+    '特别糟糕', '极为糟糕', '相当差', '非常差', '极差', '太差了', '完全不推荐',
+    '非常难看', '特别难看', '极为失望', '相当糟糕', '非常后悔',
+    # 英文负面词
+    'bad', 'terrible', 'awful', 'horrible', 'disappointing', 'disappointed',
+    'waste', 'boring', 'bored', 'poor', 'worst', 'hate', 'hated',
+    'dislike', 'disliked', 'mediocre', 'predictable', 'ridiculous',
+    'stupid', 'dumb', 'sucks', 'sucked', 'crap', 'trash', 'garbage',
+    'overrated', 'disgusting', 'annoying', 'frustrating', 'weak',
+    # 强烈英文负面词
+    'time', 'money', 'dont', "don't",
+    'bother', 'watching', 'understand', 'why', 'people', 'love'
+})
+
+# 强化程度副词 - 中英文
+INTENSIFIERS = frozenset({
+    # 中文程度副词
+    '非常', '特别', '极其', '太', '真的', '很', '相当', '十分',
+    '超级', '极度', '确实', '实在', '过于', '太过', '尤其', '格外',
+    # 英文程度副词
+    'very', 'really', 'so', 'extremely', 'absolutely', 'completely',
+    'totally', 'quite', 'rather', 'pretty', 'fairly', 'highly',
+    'truly', 'genuinely'
+})
+
+# 强化否定词 - 中英文
+NEGATIONS = frozenset({
+    # 中文否定词
+    '不', '没', '无', '别', '未', '毫无', '完全没有',
+    # 英文否定词
+    'not', 'no', 'never', 'none', 'nothing', 'nobody', 'nowhere',
+    'neither', 'nor', "don't", "dont", "doesn't", "doesnt", 
+    "didn't", "didnt", "won't", "wont", "wouldn't", "wouldnt",
+    "can't", "cant", "couldn't", "couldnt", "shouldn't", "shouldnt"
+})
+
+# 关键词提取：至少两个字符的连续中文或英文字母（单字词在正则中直接排除），以及需要过滤的停用词
+_WORD_RE = re.compile(r'[一-龥a-zA-Z]{2,}')
+
+STOP_WORDS = frozenset({
+    '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '个',
+    '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没', '看', '好',
+    '自己', '这', '那', '这个', '那个', '一个', '一些', '电影', '影片', '这部'
+})
+
+# 正、负面词典共用一个匹配器，每条文本只扫描一次
+_SENTIMENT_MATCHER = KeywordMatcher(POSITIVE_KEYWORDS | NEGATIVE_KEYWORDS)
+# 否定词和程度副词同样一次扫描，给出每次出现的位置
+_MODIFIER_MATCHER = KeywordMatcher(NEGATIONS | INTENSIFIERS)
+# 情感分数标准化的分母：两个词典的词数之和（词典非空，不会为0）
+_MAX_SCORE = len(POSITIVE_KEYWORDS) + len(NEGATIVE_KEYWORDS)
+
+
+def score_distribution(scores: List[float]) -> Dict[str, Any]:
+    """
+    一次遍历统计情感分布和平均分
+    
+    Args:
+        scores: 情感分数列表
+        
+    Returns:
+        {"positive", "neutral", "negative"} 各区间的数量及 "average" 平均分
+    """
+    positive = neutral = negative = 0
+    total = 0.0
+    for score in scores:
+        total += score
+        if score > 0.1:
+            positive += 1
+        elif score < -0.1:
+            negative += 1
+        else:
+            neutral += 1
+    count = positive + neutral + negative
+    return {
+        "positive": positive,
+        "neutral": neutral,
+        "negative": negative,
+        "average": total / count if count else 0.0
+    }
+
+
+@lru_cache(maxsize=4096)
+def _keyword_sentiment(text: str) -> float:
+    """基于关键词统计的情感分数；只依赖文本本身，相同文本直接复用结果"""
+    text_lower = text.lower()
+    
+    positive_score = 0
+    negative_score = 0
+    modifiers = _MODIFIER_MATCHER.all_positions(text_lower)
+    modifier_starts = [start for start, _ in modifiers]
+    # 情感词的每一次出现都单独计分，并各自检查前文的否定词和程度副词；
+    # 重叠时只取最长的词，"非常精彩"不会再把其中的"精彩"重复计分
+    for keyword_pos, keyword in _SENTIMENT_MATCHER.longest_positions(text_lower):
+        start_pos = max(0, keyword_pos - 8)  # 扩大搜索范围
+        preceding_text = text_lower[start_pos:keyword_pos]
+        
+        # 完整落在前文窗口内的否定词和程度副词
+        longest_negation = 0
+        has_intensifier = False
+        for k in range(bisect_left(modifier_starts, start_pos), bisect_left(modifier_starts, keyword_pos)):
+            start, word = modifiers[k]
+            if start + len(word) <= keyword_pos:
+                if word in NEGATIONS:
+                    longest_negation = max(longest_negation, len(word))
+                if word in INTENSIFIERS:
+                    has_intensifier = True
+        
+        # 只有当否定词直接修饰情感词时才算否定（最长的否定词最容易满足条件）
+        negation_found = bool(longest_negation) and len(preceding_text.strip()) <= longest_negation + 2
+        
+        if negation_found:
+            delta = -1  # 被否定的情感词
+        else:
+            delta = 1
+            # 检查程度副词
+            if has_intensifier:
+                delta += 0.5
+        
+        # 同时出现在正、负面词典中的词两边都计分
+        if keyword in POSITIVE_KEYWORDS:
+            positive_score += delta
+        if keyword in NEGATIVE_KEYWORDS:
+            negative_score += delta
+    
+    # 计算总分
+    total_score = positive_score - negative_score
+    
+    # 如果没有情感词，返回中性
+    if total_score == 0:
+        return 0.0
+    
+    # 标准化到[-1, 1]范围 - 大幅增强敏感性
+    normalized = total_score / _MAX_SCORE
+    # 极大增强敏感性，让情感表达更强烈
+    enhanced_score = normalized * 12  # 从乘以8改为乘以12
+    return max(min(enhanced_score, 1.0), -1.0)
 
 
 class SentimentAnalyzer:
@@ -44,148 +222,7 @@ class SentimentAnalyzer:
     
     def _simple_sentiment_analysis(self, text: str) -> float:
         """极简情感分析器 - 基于关键词统计"""
-        # 增强的情感词典 - 添加中英文情感词
-        positive_keywords = {
-            # 中文情感词
-            '好', '棒', '精彩', '完美', '经典', '出色', '优秀', '感人', '震撼',
-            '好看', '不错', '喜欢', '推荐', '值得', '满意', '开心', '快乐',
-            '享受', '自然', '真实', '生动', '紧凑', '巧妙', '用心', '推荐',
-            '爱', '最爱', '最佳', '杰作', '神作', '超赞', '牛逼', '厉害',
-            '优美', '深刻', '精彩绝伦', '无与伦比', '叹为观止', '拍手叫好',
-            '过瘾', '爽', '好看', '美丽', '华丽', '精致', '精彩纷呈',
-            # 强烈中文情感词
-            '太精彩了', '真的很好', '非常精彩', '特别棒', '强烈推荐', '太棒了',
-            '非常好', '特别精彩', '非常棒', '太赞了', '真的很棒', '非常出色',
-            '极为精彩', '相当精彩', '极为出色', '非常优秀', '特别优秀',
-            # 英文情感词
-            'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'brilliant',
-            'perfect', 'masterpiece', 'superb', 'outstanding', 'magnificent',
-            'beautiful', 'love', 'loved', 'best', 'incredible', 'awesome',
-            'good', 'nice', 'enjoyed', 'enjoyable', 'impressed', 'impressive',
-            'touching', 'moving', 'powerful', 'strong', 'remarkable',
-            # 强烈英文情感词
-            'absolutely', 'really', 'very', 'highly', 'truly', 'genuinely',
-            'changed', 'life', 'greatest', 'ever', 'stand', 'time', 'test', 'time'
-        }
-        
-        negative_keywords = {
-            # 中文负面词
-            '差', '烂', '糟糕', '垃圾', '失望', '后悔', '无聊', '难看', '不行',
-            '不好', '一般', '普通', '尴尬', '做作', '夸张', '生硬', '老套',
-            '俗套', '拖沓', '混乱', '牵强', '空洞', '乏味', '单调', '失望',
-            '讨厌', '恶心', '垃圾', '垃圾片', '烂片', '难看', '看不下去',
-            '浪费时间', '毁三观', '催眠', '平庸', '拙劣', '粗糙', '低劣',
-            '无趣', '枯燥', '冗长', '拖沓', '松散', '混乱不堪',
-            # 强烈中文负面情感词
-            '真的很差', '非常糟糕', '特别差', '太烂了', '完全浪费时间', '非常失望',
-            '特别糟糕', '极为糟糕', '相当差', '非常差', '极差', '太差了', '完全不推荐',
-            '非常难看', '特别难看', '极为失望', '相当糟糕', '非常后悔',
-            # 英文负面词
-            'bad', 'terrible', 'awful', 'horrible', 'disappointing', 'disappointed',
-            'waste', 'boring', 'bored', 'poor', 'worst', 'hate', 'hated',
-            'dislike', 'disliked', 'mediocre', 'predictable', 'ridiculous',
-            'stupid', 'dumb', 'sucks', 'sucked', 'crap', 'trash', 'garbage',
-            'overrated', 'disgusting', 'annoying', 'frustrating', 'weak',
-            # 强烈英文负面词
-            'absolutely', 'terrible', 'completely', 'waste', 'time', 'money', 'dont', "don't",
-            'bother', 'watching', 'understand', 'why', 'people', 'love'
-        }
-        
-        # 强化程度副词 - 中英文
-        intensifiers = {
-            # 中文程度副词
-            '非常', '特别', '极其', '太', '真的', '很', '相当', '十分', '相当',
-            '超级', '极度', '十分', '非常', '相当', '真的', '确实', '实在',
-            '过于', '太过', '尤其', '格外', '特别', '十分', '相当', '非常',
-            # 英文程度副词
-            'very', 'really', 'so', 'extremely', 'absolutely', 'completely',
-            'totally', 'quite', 'rather', 'pretty', 'fairly', 'highly',
-            'truly', 'genuinely', 'quite', 'really', 'very', 'so'
-        }
-        
-        # 强化否定词 - 中英文
-        negations = {
-            # 中文否定词
-            '不', '没', '无', '别', '未', '毫无', '完全没有',
-            # 英文否定词
-            'not', 'no', 'never', 'none', 'nothing', 'nobody', 'nowhere',
-            'neither', 'nor', "don't", "dont", "doesn't", "doesnt", 
-            "didn't", "didnt", "won't", "wont", "wouldn't", "wouldnt",
-            "can't", "cant", "couldn't", "couldnt", "shouldn't", "shouldnt"
-        }
-        
-        text_lower = text.lower()
-        
-        # 计算正面分数
-        positive_score = 0
-        for keyword in positive_keywords:
-            if keyword in text_lower:
-                # 检查否定词
-                keyword_pos = text_lower.find(keyword)
-                start_pos = max(0, keyword_pos - 8)  # 扩大搜索范围
-                preceding_text = text_lower[start_pos:keyword_pos]
-                
-                # 只有当否定词直接修饰情感词时才算否定
-                negation_found = False
-                for neg in negations:
-                    if neg in preceding_text and len(preceding_text.strip()) <= len(neg) + 2:
-                        negation_found = True
-                        break
-                
-                if negation_found:
-                    positive_score -= 1  # 被否定的正面词
-                else:
-                    positive_score += 1
-                    
-                    # 检查程度副词
-                    for intensifier in intensifiers:
-                        if intensifier in preceding_text:
-                            positive_score += 0.5
-                            break
-        
-        # 计算负面分数
-        negative_score = 0
-        for keyword in negative_keywords:
-            if keyword in text_lower:
-                # 检查否定词
-                keyword_pos = text_lower.find(keyword)
-                start_pos = max(0, keyword_pos - 8)  # 扩大搜索范围
-                preceding_text = text_lower[start_pos:keyword_pos]
-                
-                # 只有当否定词直接修饰情感词时才算否定
-                negation_found = False
-                for neg in negations:
-                    if neg in preceding_text and len(preceding_text.strip()) <= len(neg) + 2:
-                        negation_found = True
-                        break
-                
-                if negation_found:
-                    negative_score -= 1  # 被否定的负面词
-                else:
-                    negative_score += 1
-                    
-                    # 检查程度副词
-                    for intensifier in intensifiers:
-                        if intensifier in preceding_text:
-                            negative_score += 0.5
-                            break
-        
-        # 计算总分
-        total_score = positive_score - negative_score
-        
-        # 如果没有情感词，返回中性
-        if total_score == 0:
-            return 0.0
-        
-        # 标准化到[-1, 1]范围 - 大幅增强敏感性
-        max_score = len(positive_keywords) + len(negative_keywords)
-        if max_score > 0:
-            normalized = total_score / max_score
-            # 极大增强敏感性，让情感表达更强烈
-            enhanced_score = normalized * 12  # 从乘以8改为乘以12
-            return max(min(enhanced_score, 1.0), -1.0)
-        
-        return 0.0
+        return _keyword_sentiment(text)
     
     def batch_analyze(self, texts: List[str]) -> List[float]:
         """批量分析情感倾向"""
@@ -211,24 +248,10 @@ class SentimentAnalyzer:
     
     def _extract_keywords(self, text: str) -> List[str]:
         """提取关键词"""
-        # 简单的关键词提取
-        words = re.findall(r'[一-龥a-zA-Z]+', text.lower())
-        
-        # 过滤停用词
-        stop_words = {
-            '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '个',
-            '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没', '看', '好',
-            '自己', '这', '那', '这个', '那个', '一个', '一些', '电影', '影片', '这部'
-        }
-        
-        keywords = [word for word in words if word not in stop_words and len(word) > 1]
-        
-        # 统计词频并返回前10个
-        word_count = {}
-        for word in keywords:
-            word_count[word] = word_count.get(word, 0) + 1
-        
-        return [word for word, count in sorted(word_count.items(), key=lambda x: x[1], reverse=True)[:10]]
+        # 简单的关键词提取，过滤停用词后统计词频并返回前10个
+        stop_words = STOP_WORDS
+        keywords = Counter(word for word in _WORD_RE.findall(text.lower()) if word not in stop_words)
+        return [word for word, count in keywords.most_common(10)]
     
     def analyze_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
         """分析一组影评"""
@@ -242,18 +265,19 @@ class SentimentAnalyzer:
             }
         
         sentiments = []
-        keywords_counter = {}
+        # sentiments中每个分数对应的评论下标（跳过了空评论）
+        indices = []
+        keywords_counter = Counter()
         
-        for review in reviews:
+        for index, review in enumerate(reviews):
             content = review.get('content', '')
             if content:
                 sentiment = self.analyze(content)
                 sentiments.append(sentiment)
+                indices.append(index)
                 
                 # 提取关键词
-                review_keywords = self._extract_keywords(content)
-                for keyword in review_keywords:
-                    keywords_counter[keyword] = keywords_counter.get(keyword, 0) + 1
+                keywords_counter.update(self._extract_keywords(content))
         
         if not sentiments:
             return {
@@ -264,24 +288,36 @@ class SentimentAnalyzer:
                 "most_negative": None
             }
         
-        # 计算情感分布
-        positive = sum(1 for s in sentiments if s > 0.1)
-        neutral = sum(1 for s in sentiments if -0.1 <= s <= 0.1)
-        negative = sum(1 for s in sentiments if s < -0.1)
+        # 情感分布和平均分一次统计
+        distribution = score_distribution(sentiments)
         
-        # 找出最正面和最负面的评论
-        most_positive = max(reviews, key=lambda r: self.analyze(r.get('content', ''))) if reviews else None
-        most_negative = min(reviews, key=lambda r: self.analyze(r.get('content', ''))) if reviews else None
+        # 找出最正面和最负面的评论，直接复用已算出的分数
+        most_positive = reviews[indices[max(range(len(sentiments)), key=sentiments.__getitem__)]]
+        most_negative = reviews[indices[min(range(len(sentiments)), key=sentiments.__getitem__)]]
         
         return {
-            "average_sentiment": sum(sentiments) / len(sentiments),
+            "average_sentiment": distribution["average"],
             "sentiment_distribution": {
-                "positive": positive,
-                "neutral": neutral,
-                "negative": negative
+                "positive": distribution["positive"],
+                "neutral": distribution["neutral"],
+                "negative": distribution["negative"]
             },
-            "keywords": [word for word, count in sorted(keywords_counter.items(), key=lambda x: x[1], reverse=True)[:20]],
+            "keywords": [word for word, count in keywords_counter.most_common(20)],
             "most_positive": most_positive,
             "most_negative": most_negative,
             "total_reviews": len(reviews)
-        }
\ No newline at end of file
+        }
+
+
+_shared_analyzer = None
+_shared_lock = threading.Lock()
+
+
+def get_sentiment_analyzer() -> SentimentAnalyzer:
+    """获取进程内共享的情感分析器，首次调用时创建（加载模型时只加载一次）"""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        with _shared_lock:
+            if _shared_analyzer is None:
+                _shared_analyzer = SentimentAnalyzer()
+    return _shared_analyzer
@@ -0,0 +1,53 @@
+"""
+影评任务状态存储
+将任务状态快照写入Redis，供其他worker或服务重启后查询
+"""
+
+from typing import Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 未安装redis时只使用进程内状态
+    aioredis = None
+
+
+class TaskStore:
+    """基于Redis的任务状态快照存储"""
+
+    def __init__(self, url: str, ttl: int = 3600, recent_max: int = 1000):
+        """
+        Args:
+            url: Redis连接地址，如 redis://localhost:6379/0
+            ttl: 任务状态保留时间（秒），过期后自动清除
+            recent_max: 最近任务ID列表的最大长度
+        """
+        if aioredis is None:
+            raise RuntimeError("未安装redis，无法使用Redis任务存储")
+
+        self.redis = aioredis.from_url(url)
+        self.ttl = ttl
+        self.recent_max = recent_max
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        return f"task:{task_id}"
+
+    async def create(self, task_id: str, snapshot: bytes):
+        """写入新任务，并记录到最近任务列表"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(task_id), snapshot, ex=self.ttl)
+            pipe.lpush("tasks:recent", task_id)
+            pipe.ltrim("tasks:recent", 0, self.recent_max - 1)
+            await pipe.execute()
+
+    async def save(self, task_id: str, snapshot: bytes):
+        """覆盖任务状态快照（JSON）"""
+        await self.redis.set(self._key(task_id), snapshot, ex=self.ttl)
+
+    async def load(self, task_id: str) -> Optional[bytes]:
+        """读取任务状态快照，不存在时返回None"""
+        return await self.redis.get(self._key(task_id))
+
+    async def close(self):
+        """关闭连接"""
+        await self.redis.aclose()
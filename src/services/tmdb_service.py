@@ -4,35 +4,218 @@ TMDB电影数据库服务
 """
 
 import asyncio
+import logging
+import random
 import aiohttp
-from typing import Optional, List, Dict, Any
+import orjson
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import urlencode
 import os
 from ..models.review_models import MovieInfo
+from ..utils.cache import DiskCache, LRUCache
+from .sentiment_analyzer import SentimentAnalyzer, get_sentiment_analyzer, score_distribution
+
+logger = logging.getLogger(__name__)
+
+
+# 缓存键版本号，修改TMDB_CACHE_VERSION即可让旧缓存全部失效
+TMDB_CACHE_VERSION = os.getenv("TMDB_CACHE_VERSION", "1")
+# 已上映电影的元数据很少变化，评论更新较快
+SEARCH_CACHE_TTL = 24 * 60 * 60
+REVIEWS_CACHE_TTL = 60 * 60
+# 原始接口响应的进程内缓存，热门榜、评论页等较新的数据也会经过这一层
+RESPONSE_CACHE_TTL = 60 * 60
+# 接口响应的持久化缓存（SQLite），供本地开发或离线回放时不必重新请求TMDB，默认关闭，设置路径后启用；
+# 评论和热门榜按REVIEWS_CACHE_TTL过期，其余（搜索、详情、演职员、关键词）按SEARCH_CACHE_TTL过期
+TMDB_CACHE_PATH = os.getenv("TMDB_CACHE_PATH", "")
+VOLATILE_PATHS = ("/reviews", "/movie/popular")
+# 429限流或5xx时的重试次数；退避时间优先取响应的Retry-After
+TMDB_MAX_RETRIES = int(os.getenv("TMDB_MAX_RETRIES", "3"))
+TMDB_MAX_BACKOFF = 30
+# 评论最多取的页数，以及同时请求的评论页数上限（TMDB限流约每10秒40次）
+TMDB_MAX_REVIEW_PAGES = 5
+TMDB_REVIEW_PAGE_CONCURRENCY = 5
+# 热门榜等批量查询时同时进行的电影详情查询数（每部电影一个详情请求）
+TMDB_SEARCH_CONCURRENCY = 8
+# 网络故障、超时和响应格式异常时降级返回基础信息，其余异常（代码错误）照常抛出
+_REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError)
 
 
 class TMDBService:
     """TMDB API服务"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: Optional[aiohttp.ClientSession] = None,
+                 sentiment_analyzer: Optional[SentimentAnalyzer] = None):
+        """
+        Args:
+            api_key: TMDB API密钥
+            session: 外部共享的HTTP会话，由调用方负责关闭；未提供时按需自建
+            sentiment_analyzer: 计算评论评分用的情感分析器，未提供时使用进程内共享的实例
+        """
         self.api_key = api_key
         self.base_url = "https://api.themoviedb.org/3"
         self.image_base_url = "https://image.tmdb.org/t/p/w500"
-        self.session = None
+        self.session = session
+        self._owns_session = session is None
+        self.sentiment_analyzer = sentiment_analyzer or get_sentiment_analyzer()
+        self._search_cache = LRUCache(maxsize=2048, ttl=SEARCH_CACHE_TTL)
+        self._reviews_cache = LRUCache(maxsize=1024, ttl=REVIEWS_CACHE_TTL)
+        self._response_cache = LRUCache(maxsize=4096, ttl=RESPONSE_CACHE_TTL)
+        self._disk_cache = None
+        if TMDB_CACHE_PATH:
+            try:
+                self._disk_cache = DiskCache(
+                    os.path.expanduser(TMDB_CACHE_PATH), ttl=SEARCH_CACHE_TTL, stale_ttl=SEARCH_CACHE_TTL
+                )
+            except Exception as e:
+                logger.error("TMDB响应缓存不可用: %s", e)
+        # 进行中的请求，相同请求并发到达时共用同一次网络往返
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._page_gate = asyncio.Semaphore(TMDB_REVIEW_PAGE_CONCURRENCY)
     
     async def __aenter__(self):
         """异步上下文管理器"""
-        self.session = aiohttp.ClientSession()
+        self._ensure_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器退出"""
-        if self.session:
+        await self.close()
+    
+    async def close(self):
+        """关闭自建的HTTP会话（外部传入的会话由调用方关闭）"""
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
+    
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """返回HTTP会话：未传入共享会话时在首次请求时创建，之后所有请求复用同一连接池"""
+        # 检查和创建之间没有await，并发请求不会各自创建会话
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=20, keepalive_timeout=75, ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=15, connect=5)
+            )
+        return self.session
+    
+    async def _get_json(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        请求TMDB接口：先查缓存，相同请求正在进行时等待其结果
+        
+        Args:
+            path: 接口路径，如 /search/movie
+            params: 查询参数
+            
+        Returns:
+            响应JSON（与缓存共享，调用方不应修改），请求失败时返回None
+        """
+        key = (path, tuple(sorted((name, value) for name, value in params.items() if name != 'api_key')))
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_json(key, path, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 某个等待方被取消时不影响共用这次请求的其他调用方
+        return await asyncio.shield(task)
+    
+    async def _request_json(self, key: tuple, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        先查持久化缓存，未命中时发出请求，限流或服务端错误时退避重试，成功的响应写入缓存
+        
+        持久化缓存中已过期的条目带上ETag发条件请求，TMDB返回304时直接续期旧响应，不必重新下载和解析
+        """
+        disk_key = f"{TMDB_CACHE_VERSION}:{path}?{urlencode(key[1])}"
+        stale = None
+        headers = {}
+        if self._disk_cache is not None:
+            # SQLite读写是同步的磁盘IO，放到线程中执行，不阻塞事件循环
+            entry = await asyncio.to_thread(self._disk_lookup, disk_key)
+            if entry is not None:
+                blob, fresh, etag = entry
+                if fresh:
+                    data = orjson.loads(blob)
+                    self._response_cache.set(key, data)
+                    return data
+                if etag is not None:
+                    stale = blob
+                    headers['If-None-Match'] = etag
+        
+        url = f"{self.base_url}{path}"
+        for attempt in range(TMDB_MAX_RETRIES + 1):
+            async with self._ensure_session().get(url, params=params, headers=headers) as response:
+                if response.status == 200:
+                    # 直接用orjson解析响应体，跳过aiohttp的content-type检查和标准库json
+                    blob = await response.read()
+                    data = orjson.loads(blob)
+                    self._response_cache.set(key, data)
+                    if self._disk_cache is not None:
+                        await asyncio.to_thread(
+                            self._disk_store, disk_key, path, blob, response.headers.get("ETag")
+                        )
+                    return data
+                # 读完304或错误响应的响应体（通常很短），连接才能放回连接池复用；未读完的连接会被直接关闭
+                await response.read()
+                if response.status == 304 and stale is not None:
+                    data = orjson.loads(stale)
+                    self._response_cache.set(key, data)
+                    await asyncio.to_thread(self._disk_store, disk_key, path, stale, headers['If-None-Match'])
+                    return data
+                if attempt == TMDB_MAX_RETRIES or (response.status != 429 and response.status < 500):
+                    break
+                delay = self._retry_delay(response.headers.get("Retry-After"), attempt)
+            await asyncio.sleep(delay)
+        
+        # 重新验证失败，旧响应和它的ETag一并删除
+        if stale is not None:
+            await asyncio.to_thread(self._disk_drop, disk_key)
+        return None
+    
+    def _disk_lookup(self, disk_key: str) -> Optional[Tuple[bytes, bool, Optional[str]]]:
+        """读取持久化缓存：返回 (响应体, 是否仍在有效期内, ETag)，不存在时返回None"""
+        entry = self._disk_cache.get_entry(disk_key)
+        if entry is None:
+            return None
+        blob, fresh = entry
+        etag = None if fresh else self._disk_cache.get_entry(f"{disk_key}#etag")
+        return blob, fresh, etag[0].decode() if etag is not None else None
+    
+    def _disk_drop(self, disk_key: str):
+        """删除持久化缓存中的响应及其ETag"""
+        self._disk_cache.pop(disk_key)
+        self._disk_cache.pop(f"{disk_key}#etag")
+    
+    def _disk_store(self, disk_key: str, path: str, blob: bytes, etag: Optional[str]):
+        """把响应体写入持久化缓存（有效期从现在重新计算），有ETag时一并记录，没有时清掉旧的ETag"""
+        volatile = any(marker in path for marker in VOLATILE_PATHS)
+        ttl = REVIEWS_CACHE_TTL if volatile else None
+        self._disk_cache.set(disk_key, blob, ttl=ttl)
+        if etag:
+            self._disk_cache.set(f"{disk_key}#etag", etag.encode(), ttl=ttl)
+        else:
+            self._disk_cache.pop(f"{disk_key}#etag")
+    
+    @staticmethod
+    def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+        """计算重试等待时间：有Retry-After（秒）时遵循，否则指数退避加随机抖动"""
+        if retry_after:
+            try:
+                return min(float(retry_after), TMDB_MAX_BACKOFF)
+            except ValueError:
+                pass
+        return min(2 ** attempt, TMDB_MAX_BACKOFF) * random.uniform(0.5, 1.0)
     
     async def search_movie(self, title: str, year: Optional[int] = None) -> MovieInfo:
         """搜索电影信息"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        cache_key = (TMDB_CACHE_VERSION, title.strip().lower(), year)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # 搜索电影
@@ -42,18 +225,15 @@ class TMDBService:
             
             # 获取最匹配的电影
             movie_data = search_results['results'][0]
-            movie_id = movie_data['id']
-            
-            # 获取详细信息
-            details = await self._get_movie_details(movie_id)
-            credits = await self._get_movie_credits(movie_id)
-            keywords = await self._get_movie_keywords(movie_id)
             
-            # 构建MovieInfo对象
-            return self._build_movie_info(details, credits, keywords)
+            # 只缓存成功匹配到TMDB条目的结果
+            movie_info = await self._fetch_movie_by_id(movie_data['id'])
+            if movie_info.id:
+                self._search_cache.set(cache_key, movie_info)
+            return movie_info
             
-        except Exception as e:
-            print(f"TMDB搜索错误: {e}")
+        except _REQUEST_ERRORS as e:
+            logger.warning("TMDB搜索错误（%s）: %s", title, e)
             # 返回基础信息，避免网络问题导致失败
             return MovieInfo(
                 title=title,
@@ -73,81 +253,41 @@ class TMDBService:
         if year:
             params['year'] = year
         
-        async with self.session.get(f"{self.base_url}/search/movie", params=params) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                return {'results': []}
+        return await self._get_json("/search/movie", params) or {'results': []}
     
     async def _get_movie_details(self, movie_id: int) -> Dict[str, Any]:
-        """获取电影详细信息"""
+        """获取电影详细信息，演职员（credits）和关键词（keywords）附带在同一响应中"""
         params = {
             'api_key': self.api_key,
             'language': 'zh-CN',
-            'append_to_response': 'release_dates'
-        }
-        
-        async with self.session.get(f"{self.base_url}/movie/{movie_id}", params=params) as response:
-            if response.status == 200:
-                return await response.json()
-            return {}
-    
-    async def _get_movie_credits(self, movie_id: int) -> Dict[str, Any]:
-        """获取电影演职员信息"""
-        params = {
-            'api_key': self.api_key,
-            'language': 'zh-CN'
+            'append_to_response': 'credits,keywords,release_dates'
         }
         
-        async with self.session.get(f"{self.base_url}/movie/{movie_id}/credits", params=params) as response:
-            if response.status == 200:
-                return await response.json()
-            return {}
+        return await self._get_json(f"/movie/{movie_id}", params) or {}
     
-    async def _get_movie_keywords(self, movie_id: int) -> Dict[str, Any]:
-        """获取电影关键词"""
-        params = {
-            'api_key': self.api_key,
-            'language': 'zh-CN'
-        }
-        
-        async with self.session.get(f"{self.base_url}/movie/{movie_id}/keywords", params=params) as response:
-            if response.status == 200:
-                return await response.json()
-            return {}
+    async def _fetch_movie_by_id(self, movie_id: int) -> MovieInfo:
+        """按TMDB电影ID获取MovieInfo，详细信息、演职员和关键词通过append_to_response一次请求取回"""
+        details = await self._get_movie_details(movie_id)
+        return self._build_movie_info(details)
     
-    def _build_movie_info(self, details: Dict[str, Any], credits: Dict[str, Any], keywords: Dict[str, Any]) -> MovieInfo:
-        """构建MovieInfo对象"""
-        # 提取导演信息
-        directors = []
-        for crew_member in credits.get('crew', []):
-            if crew_member.get('job') == 'Director':
-                directors.append(crew_member.get('name', ''))
-        
-        # 提取主要演员
-        cast = []
-        for actor in credits.get('cast', [])[:10]:  # 取前10个演员
-            cast.append(actor.get('name', ''))
-        
-        # 提取关键词
-        keyword_list = []
-        for keyword in keywords.get('keywords', []):
-            keyword_list.append(keyword.get('name', ''))
-        
-        # 提取制作公司
-        companies = []
-        for company in details.get('production_companies', []):
-            companies.append(company.get('name', ''))
-        
-        # 提取类型
-        genres = []
-        for genre in details.get('genres', []):
-            genres.append(genre.get('name', ''))
-        
-        return MovieInfo(
+    def _build_movie_info(self, details: Dict[str, Any]) -> MovieInfo:
+        """根据附带credits和keywords的详情响应构建MovieInfo对象"""
+        credits = details.get('credits') or {}
+        keywords = details.get('keywords') or {}
+        
+        # 提取导演、主要演员（前10个）、关键词、制作公司和类型；缺省值用空元组，不必每次新建列表
+        directors = [c.get('name', '') for c in credits.get('crew', ()) if c.get('job') == 'Director']
+        cast = [actor.get('name', '') for actor in credits.get('cast', ())[:10]]
+        keyword_list = [keyword.get('name', '') for keyword in keywords.get('keywords', ())]
+        companies = [company.get('name', '') for company in details.get('production_companies', ())]
+        genres = [genre.get('name', '') for genre in details.get('genres', ())]
+        release_date = details.get('release_date')
+        
+        # 字段均已在上面整理成目标类型，跳过校验直接构造
+        return MovieInfo.model_construct(
             id=details.get('id'),
             title=details.get('title', ''),
-            year=int(details.get('release_date', '').split('-')[0]) if details.get('release_date') else None,
+            year=int(release_date.split('-', 1)[0]) if release_date else None,
             director=directors,
             cast=cast,
             genre=genres,
@@ -155,7 +295,7 @@ class TMDBService:
             plot=details.get('overview'),
             rating=details.get('vote_average'),
             poster_url=f"{self.image_base_url}{details.get('poster_path')}" if details.get('poster_path') else None,
-            release_date=details.get('release_date'),
+            release_date=release_date,
             budget=details.get('budget'),
             revenue=details.get('revenue'),
             popularity=details.get('popularity'),
@@ -167,32 +307,40 @@ class TMDBService:
     
     async def get_popular_movies(self, page: int = 1) -> List[MovieInfo]:
         """获取热门电影"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
         params = {
             'api_key': self.api_key,
             'language': 'zh-CN',
             'page': page
         }
         
-        async with self.session.get(f"{self.base_url}/movie/popular", params=params) as response:
-            if response.status == 200:
-                data = await response.json()
-                movies = []
-                
-                for movie_data in data.get('results', []):
-                    movie = await self.search_movie(movie_data['title'])
-                    movies.append(movie)
-                
-                return movies
-        
-        return []
+        data = await self._get_json("/movie/popular", params)
+        if data is None:
+            return []
+        
+        # 热门榜已带有电影ID，直接按ID取详情，不再按片名重新搜索；
+        # 各电影的详情查询并发进行（限制并发数以免触发限流），结果保持热门榜顺序
+        gate = asyncio.Semaphore(TMDB_SEARCH_CONCURRENCY)
+        
+        async def _fetch(movie_data: Dict[str, Any]) -> MovieInfo:
+            async with gate:
+                try:
+                    movie_info = await self._fetch_movie_by_id(movie_data['id'])
+                    if movie_info.id:
+                        return movie_info
+                except _REQUEST_ERRORS as e:
+                    logger.warning("TMDB详情获取错误（%s）: %s", movie_data.get('id'), e)
+            # 详情获取失败时用热门榜条目自带的字段（标题、上映日期、简介、评分等）构建
+            return self._build_movie_info(movie_data)
+        
+        movies = await asyncio.gather(*(_fetch(movie_data) for movie_data in data.get('results', [])))
+        return list(movies)
     
     async def get_movie_reviews(self, movie_id: int, page: int = 1) -> List[Dict[str, Any]]:
         """获取电影评论"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        cache_key = (TMDB_CACHE_VERSION, movie_id, page)
+        cached = self._reviews_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
         
         params = {
             'api_key': self.api_key,
@@ -201,30 +349,50 @@ class TMDBService:
         }
         
         try:
-            async with self.session.get(f"{self.base_url}/movie/{movie_id}/reviews", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    reviews = data.get('results', [])
-                    
-                    # 获取多页评论（最多5页）
-                    total_pages = min(data.get('total_pages', 1), 5)
-                    for page_num in range(2, total_pages + 1):
-                        params['page'] = page_num
-                        async with self.session.get(f"{self.base_url}/movie/{movie_id}/reviews", params=params) as page_response:
-                            if page_response.status == 200:
-                                page_data = await page_response.json()
-                                reviews.extend(page_data.get('results', []))
-                    
-                    return reviews
-        except Exception as e:
-            print(f"获取评论失败: {e}")
+            path = f"/movie/{movie_id}/reviews"
+            data = await self._get_json(path, params)
+            if data is not None:
+                reviews = list(data.get('results', []))
+                
+                # 获取多页评论（最多TMDB_MAX_REVIEW_PAGES页），其余页并发请求，按页码顺序合并
+                total_pages = min(data.get('total_pages', 1), TMDB_MAX_REVIEW_PAGES)
+                pages = await asyncio.gather(
+                    *(self._get_review_page(path, {**params, 'page': page_num})
+                      for page_num in range(2, total_pages + 1))
+                )
+                for page_data in pages:
+                    if page_data is not None:
+                        reviews.extend(page_data.get('results', []))
+                
+                self._reviews_cache.set(cache_key, reviews)
+                return list(reviews)
+        except _REQUEST_ERRORS as e:
+            logger.warning("获取评论失败（%s）: %s", movie_id, e)
         
         return []
     
+    async def _get_review_page(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """请求一页评论，所有电影的评论翻页共用并发上限"""
+        async with self._page_gate:
+            return await self._get_json(path, params)
+    
+    async def fetch_reviews_with_breakdown(self, movie_id: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        获取电影评论并基于同一批评论计算评分，只请求一次评论接口
+        
+        Returns:
+            (评论列表, 评分数据)
+        """
+        reviews = await self.get_movie_reviews(movie_id)
+        return reviews, self.rating_from_reviews(reviews)
+    
     async def calculate_review_based_rating(self, movie_id: int) -> Dict[str, Any]:
         """基于评论计算评分 - 全新算法"""
         reviews = await self.get_movie_reviews(movie_id)
-        
+        return self.rating_from_reviews(reviews)
+    
+    def rating_from_reviews(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """根据已获取的评论列表计算评分"""
         if not reviews:
             return {
                 "rating": 0.0,
@@ -235,16 +403,11 @@ class TMDBService:
                 "confidence_level": "无数据"
             }
         
-        # 使用情感分析器分析评论
-        from .sentiment_analyzer import SentimentAnalyzer
-        analyzer = SentimentAnalyzer()
-        
-        sentiment_results = []
-        for review in reviews:
-            content = review.get('content', '')
-            if content:
-                sentiment = analyzer.analyze(content)
-                sentiment_results.append(sentiment)
+        # 使用情感分析器分析评论：所有评论一次批量分析，分数与reviews一一对应（空评论为0.0）
+        review_sentiments = self.sentiment_analyzer.batch_analyze([review.get('content', '') for review in reviews])
+        sentiment_results = [
+            sentiment for review, sentiment in zip(reviews, review_sentiments) if review.get('content', '')
+        ]
         
         if not sentiment_results:
             return {
@@ -253,13 +416,15 @@ class TMDBService:
                 "sentiment_distribution": {"positive": 0, "neutral": 0, "negative": 0},
                 "average_sentiment": 0.0,
                 "rating_breakdown": {},
-                "confidence_level": "无情感数据"
+                "confidence_level": "无情感数据",
+                "review_sentiments": review_sentiments
             }
         
-        # 计算情感分布
-        positive = sum(1 for s in sentiment_results if s > 0.1)
-        neutral = sum(1 for s in sentiment_results if -0.1 <= s <= 0.1)
-        negative = sum(1 for s in sentiment_results if s < -0.1)
+        # 情感分布和平均分一次统计
+        distribution = score_distribution(sentiment_results)
+        positive = distribution["positive"]
+        neutral = distribution["neutral"]
+        negative = distribution["negative"]
         total_reviews = len(sentiment_results)
         
         # 新的评分算法 - 更贴合实际
@@ -275,10 +440,11 @@ class TMDBService:
                 "neutral": neutral,
                 "negative": negative
             },
-            "average_sentiment": round(sum(sentiment_results) / len(sentiment_results), 3),
+            "average_sentiment": round(distribution["average"], 3),
             "rating_breakdown": rating_components["breakdown"],
             "confidence_level": rating_components["confidence"],
-            "reviews_sample": reviews[:5]
+            "reviews_sample": reviews[:5],
+            "review_sentiments": review_sentiments
         }
     
     def _calculate_comprehensive_rating(self, positive: int, neutral: int, negative: int, 
@@ -379,15 +545,19 @@ class TMDBService:
         if not sentiment_results:
             return 5.0
         
-        # 计算平均情感强度
-        avg_sentiment = abs(sum(sentiment_results) / len(sentiment_results))
+        # 一次遍历同时得到平均值和样本标准差（Welford算法），标准差反映评价的一致性
+        count = 0
+        mean = 0.0
+        m2 = 0.0
+        for sentiment in sentiment_results:
+            count += 1
+            delta = sentiment - mean
+            mean += delta / count
+            m2 += delta * (sentiment - mean)
         
-        # 计算情感的标准差，反映评价的一致性
-        import statistics
-        if len(sentiment_results) > 1:
-            sentiment_std = statistics.stdev(sentiment_results)
-        else:
-            sentiment_std = 0
+        # 计算平均情感强度
+        avg_sentiment = abs(mean)
+        sentiment_std = (m2 / (count - 1)) ** 0.5 if count > 1 else 0
         
         # 强度映射到评分 - 更敏感的映射
         if avg_sentiment >= 0.7:
@@ -0,0 +1,219 @@
+"""
+缓存工具
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+
+class LRUCache:
+    """线程安全的LRU缓存，支持可选的过期时间"""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: 最大条目数，超出后淘汰最久未使用的条目
+            ttl: 条目有效期（秒），None表示永不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            default: 未命中或已过期时的返回值
+
+        Returns:
+            缓存的值
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存的值
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """移除并返回缓存条目"""
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item is not None else default
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """基于SQLite的持久化缓存，值为bytes，进程重启后仍然有效"""
+
+    # 每写入这么多次清理一次过期条目
+    PURGE_INTERVAL = 500
+
+    def __init__(self, path: str, ttl: Optional[float] = None, stale_ttl: float = 0):
+        """
+        Args:
+            path: SQLite数据库文件路径，所在目录不存在时自动创建
+            ttl: 条目有效期（秒），None表示永不过期
+            stale_ttl: 过期条目再保留的时间（秒），期间仍可通过get_entry读到，用于条件请求重新验证
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """读取缓存，未命中或已过期时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return value
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, bool]]:
+        """
+        读取缓存条目，已过期但仍在stale_ttl保留期内的条目也返回（供条件请求重新验证后续期）
+
+        Returns:
+            (缓存的值, 是否仍在有效期内)，不存在时返回None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at < now - self.stale_ttl:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return value, expires_at is None or expires_at >= now
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存的值
+            ttl: 本条目的有效期（秒），未指定时使用缓存的默认有效期
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.PURGE_INTERVAL == 0:
+                self._purge_locked()
+
+    def set_many(self, items: Iterable[Tuple[str, bytes]], ttl: Optional[float] = None) -> None:
+        """
+        在一个事务中写入多条缓存
+
+        Args:
+            items: (缓存键, 缓存的值) 序列
+            ttl: 这些条目的有效期（秒），未指定时使用缓存的默认有效期
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        rows = [(key, value, expires_at) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            before = self._writes
+            self._writes += len(rows)
+            if self._writes // self.PURGE_INTERVAL != before // self.PURGE_INTERVAL:
+                self._purge_locked()
+
+    def purge_expired(self) -> None:
+        """删除过期（且超过stale_ttl保留期）的条目，打开缓存时和每PURGE_INTERVAL次写入后自动执行"""
+        with self._lock:
+            self._purge_locked()
+
+    def _purge_locked(self) -> None:
+        self._conn.execute(
+            "DELETE FROM cache WHERE expires_at < ?", (time.time() - self.stale_ttl,)
+        )
+        self._conn.commit()
+
+    def pop(self, key: str) -> None:
+        """移除缓存条目"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+_MISSING = object()
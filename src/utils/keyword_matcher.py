@@ -0,0 +1,99 @@
+"""
+关键词匹配工具
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装pyahocorasick时逐词查找
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """多关键词匹配器：一次扫描文本找出所有出现的关键词"""
+
+    def __init__(self, words: Iterable[str]):
+        """
+        Args:
+            words: 关键词集合
+        """
+        self.words = frozenset(words)
+        self._automaton = None
+        if ahocorasick is not None and self.words:
+            automaton = ahocorasick.Automaton()
+            for word in self.words:
+                automaton.add_word(word, word)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def first_positions(self, text: str) -> Dict[str, int]:
+        """
+        查找文本中出现的关键词
+
+        Args:
+            text: 待匹配的文本
+
+        Returns:
+            {关键词: 首次出现的位置}，重叠的关键词（如"好"和"好看"）分别计入
+        """
+        if self._automaton is None:
+            return {word: text.find(word) for word in self.words if word in text}
+
+        # 自动机按结束位置顺序给出所有匹配，同一关键词第一次出现即为最早位置
+        positions = {}
+        for end, word in self._automaton.iter(text):
+            if word not in positions:
+                positions[word] = end - len(word) + 1
+        return positions
+
+    def all_positions(self, text: str) -> List[Tuple[int, str]]:
+        """
+        查找文本中关键词的每一次出现
+
+        Args:
+            text: 待匹配的文本
+
+        Returns:
+            按起始位置排序的 (位置, 关键词) 列表，重叠的出现分别计入
+        """
+        if self._automaton is None:
+            matches = []
+            for word in self.words:
+                pos = text.find(word)
+                while pos != -1:
+                    matches.append((pos, word))
+                    pos = text.find(word, pos + 1)
+        else:
+            matches = [(end - len(word) + 1, word) for end, word in self._automaton.iter(text)]
+        matches.sort()
+        return matches
+
+    def longest_positions(self, text: str) -> List[Tuple[int, str]]:
+        """
+        从左到右取互不重叠的最长匹配
+
+        Args:
+            text: 待匹配的文本
+
+        Returns:
+            按起始位置排序的 (位置, 关键词) 列表；被更长关键词覆盖的短词（如"非常精彩"中的"精彩"）不计入
+        """
+        matches = []
+        covered_end = 0
+        best = None
+        for start, word in self.all_positions(text):
+            if start < covered_end:
+                continue
+            if best is not None and start != best[0]:
+                # 上一个起始位置的最长匹配已确定
+                matches.append(best)
+                covered_end = best[0] + len(best[1])
+                best = None
+                if start < covered_end:
+                    continue
+            if best is None or len(word) > len(best[1]):
+                best = (start, word)
+        if best is not None:
+            matches.append(best)
+        return matches
@@ -4,276 +4,339 @@
 
 import re
 import jieba
+import logging
+import threading
+from collections import Counter
 from typing import List, Dict, Any
 import html
 import unicodedata
 
 
-class TextProcessor:
-    """文本处理器"""
+# 导入时在后台线程加载jieba词典，避免首次分词时阻塞调用方（加载完成前的分词调用会等待jieba内部的锁）
+jieba.setLogLevel(logging.ERROR)
+threading.Thread(target=jieba.initialize, daemon=True, name="jieba-init").start()
+
+# 统计字数时去除的空白字符（含全角空格）
+WHITESPACE_TRANS = str.maketrans('', '', ' \n\t\r\u3000')
+
+# 预编译的正则表达式
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_TITLE_PATTERNS = (
+    re.compile(r'《([^》]+)》'),
+    re.compile(r'电影[:：]\s*([^，。！？\n]+)'),
+    re.compile(r'影片[:：]\s*([^，。！？\n]+)'),
+    re.compile(r'([^《》]+?)\s*(电影|影片)')
+)
+_YEAR_RE = re.compile(r'(19|20)\d{2}')
+_SENTENCE_SPLIT_RE = re.compile(r'[。！？\n]+')
+# 按连续片段匹配，字符数取片段长度之和，不必为每个字符生成一个匹配结果
+_CHINESE_RUN_RE = re.compile(r'[\u4e00-\u9fa5]+')
+_ENGLISH_WORD_RE = re.compile(r'[a-zA-Z]+')
+# 包含评价性词汇的句子视为重要语句
+_EVALUATIVE_RE = re.compile('|'.join([
+    '精彩', '优秀', '出色', '震撼', '感动', '经典', '推荐',
+    '糟糕', '失望', '无聊', '难看', '雷人', '狗血', '老套',
+    '创新', '突破', '惊喜', '惊艳', '完美', '失败'
+]))
+# 纯ASCII文本不经过jieba，直接按连续的字母数字切词
+_ASCII_TOKEN_RE = re.compile(r'[a-zA-Z0-9]+')
+_QUOTE_PATTERNS = (
+    re.compile(r'"([^"]+)"'),
+    re.compile(r'"([^"]+)"'),
+    re.compile(r'『([^』]+)』'),
+    re.compile(r'「([^」]+)」')
+)
+
+
+# 关键词提取时过滤的停用词
+KEYWORD_STOP_WORDS = frozenset({
+    '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '个',
+    '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没', '看', '好',
+    '自己', '这', '那', '这个', '那个', '一个', '一些', '电影', '影片', '这部'
+})
+
+# clean_text保留的基本标点
+_KEPT_PUNCTUATION = frozenset('，。！？：；""''（）【】《》…—')
+
+
+class _KeepCharsTable(dict):
+    """
+    str.translate用的字符过滤表：保留中文、英文、数字、空白和基本标点，其余字符删除
     
-    def __init__(self):
-        # 初始化jieba分词
-        jieba.initialize()
+    按需判断遇到的字符并记住结果，不必预先为全部Unicode字符建表
+    """
     
-    def clean_text(self, text: str) -> str:
-        """
-        清理文本
-        
-        Args:
-            text: 原始文本
-            
-        Returns:
-            清理后的文本
-        """
-        if not text:
-            return ""
-        
-        # HTML解码
-        text = html.unescape(text)
-        
-        # Unicode规范化
-        text = unicodedata.normalize('NFKC', text)
-        
-        # 移除HTML标签
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # 移除特殊字符，但保留中文、英文、数字和基本标点
-        text = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9\s，。！？：；""''（）【】《》…—]', '', text)
-        
+    def __missing__(self, code: int):
+        char = chr(code)
+        keep = (
+            '\u4e00' <= char <= '\u9fa5' or 'a' <= char <= 'z' or 'A' <= char <= 'Z'
+            or '0' <= char <= '9' or char.isspace() or char in _KEPT_PUNCTUATION
+        )
+        self[code] = code if keep else None
+        return self[code]
+
+
+_KEEP_CHARS_TABLE = _KeepCharsTable()
+
+
+def clean_text(text: str) -> str:
+    """
+    清理文本
+    
+    Args:
+        text: 原始文本
+        
+    Returns:
+        清理后的文本
+    """
+    if not text:
+        return ""
+    
+    # HTML解码
+    text = html.unescape(text)
+    
+    # Unicode规范化
+    text = unicodedata.normalize('NFKC', text)
+    
+    # 移除HTML标签
+    text = _HTML_TAG_RE.sub('', text)
+    
+    # 移除特殊字符，但保留中文、英文、数字和基本标点（一次translate完成）
+    text = text.translate(_KEEP_CHARS_TABLE)
+    
+    # 移除多余的空白字符（放在最后，删除字符后留下的连续空白也一并合并）
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def extract_movie_title(text: str) -> str:
+    """
+    从文本中提取电影标题
+    
+    Args:
+        text: 包含电影名的文本
+        
+    Returns:
+        提取的电影标题
+    """
+    # 移除常见的前后缀
+    for pattern in _TITLE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    
+    return text.strip()
+
+
+def extract_year(text: str) -> int:
+    """
+    从文本中提取年份
+    
+    Args:
+        text: 包含年份的文本
+        
+    Returns:
+        提取的年份，如果找不到返回None
+    """
+    year_match = _YEAR_RE.search(text)
+    if year_match:
+        return int(year_match.group())
+    return None
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    将文本分割成句子
+    
+    Args:
+        text: 原始文本
+        
+    Returns:
+        句子列表
+    """
+    # 中文句子分割
+    sentences = _SENTENCE_SPLIT_RE.split(text)
+    
+    # 清理和过滤
+    sentences = [s.strip() for s in sentences if s.strip()]
+    
+    return sentences
+
+
+def extract_keywords(text: str, top_k: int = 10) -> List[str]:
+    """
+    提取关键词
+    
+    Args:
+        text: 文本
+        top_k: 返回的关键词数量
+        
+    Returns:
+        关键词列表
+    """
+    if not text:
+        return []
+    
+    # 分词（生成器，不构造完整的词列表），过滤停用词和短词后统计词频；
+    # 纯ASCII文本（英文评论）没有需要jieba切分的中文，直接用正则切词
+    words = _ASCII_TOKEN_RE.findall(text) if text.isascii() else jieba.cut(text)
+    word_freq = Counter(
+        word for word in words if len(word) > 1 and word not in KEYWORD_STOP_WORDS
+    )
+    
+    # 返回前top_k个关键词
+    return [word for word, freq in word_freq.most_common(top_k)]
+
+
+def summarize_text(text: str, max_length: int = 100) -> str:
+    """
+    文本摘要
+    
+    Args:
+        text: 原始文本
+        max_length: 摘要最大长度
+        
+    Returns:
+        摘要文本
+    """
+    if not text:
+        return ""
+    
+    if len(text) <= max_length:
         return text
     
-    def extract_movie_title(self, text: str) -> str:
-        """
-        从文本中提取电影标题
-        
-        Args:
-            text: 包含电影名的文本
-            
-        Returns:
-            提取的电影标题
-        """
-        # 移除常见的前后缀
-        patterns = [
-            r'《([^》]+)》',
-            r'电影[:：]\s*([^，。！？\n]+)',
-            r'影片[:：]\s*([^，。！？\n]+)',
-            r'([^《》]+?)\s*(电影|影片)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()
-        
-        return text.strip()
+    # 简单的基于句子位置的摘要
+    sentences = split_sentences(text)
+    if not sentences:
+        return text[:max_length] + "..."
     
-    def extract_year(self, text: str) -> int:
-        """
-        从文本中提取年份
-        
-        Args:
-            text: 包含年份的文本
-            
-        Returns:
-            提取的年份，如果找不到返回None
-        """
-        year_match = re.search(r'(19|20)\d{2}', text)
-        if year_match:
-            return int(year_match.group())
-        return None
-    
-    def split_sentences(self, text: str) -> List[str]:
-        """
-        将文本分割成句子
-        
-        Args:
-            text: 原始文本
-            
-        Returns:
-            句子列表
-        """
-        # 中文句子分割
-        sentences = re.split(r'[。！？\n]+', text)
-        
-        # 清理和过滤
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        return sentences
+    # 取前几个句子（累计长度用整数记录，最后一次性拼接）
+    parts = []
+    summary_length = 0
+    for sentence in sentences:
+        if summary_length + len(sentence) > max_length:
+            break
+        parts.append(sentence)
+        summary_length += len(sentence) + 1
     
-    def extract_keywords(self, text: str, top_k: int = 10) -> List[str]:
-        """
-        提取关键词
-        
-        Args:
-            text: 文本
-            top_k: 返回的关键词数量
-            
-        Returns:
-            关键词列表
-        """
-        if not text:
-            return []
-        
-        # 分词
-        words = jieba.lcut(text)
-        
-        # 过滤停用词和短词
-        stop_words = {
-            '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '个',
-            '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没', '看', '好',
-            '自己', '这', '那', '这个', '那个', '一个', '一些', '电影', '影片', '这部',
-            '的', '了', '在', '是', '我', '有', '和', '就', '不', '人', '都', '一', '个',
-            '上', '也', '很', '到', '说', '要', '去', '你', '会', '着', '没', '看', '好',
-            '自己', '这', '那', '这个', '那个', '一个', '一些', '电影', '影片', '这部'
-        }
-        
-        filtered_words = [word for word in words if word not in stop_words and len(word) > 1]
-        
-        # 统计词频
-        word_freq = {}
-        for word in filtered_words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # 返回前top_k个关键词
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:top_k]]
+    if not parts:
+        return text[:max_length] + "..."
     
-    def summarize_text(self, text: str, max_length: int = 100) -> str:
-        """
-        文本摘要
-        
-        Args:
-            text: 原始文本
-            max_length: 摘要最大长度
-            
-        Returns:
-            摘要文本
-        """
-        if not text:
-            return ""
-        
-        if len(text) <= max_length:
-            return text
-        
-        # 简单的基于句子位置的摘要
-        sentences = self.split_sentences(text)
-        if not sentences:
-            return text[:max_length] + "..."
-        
-        # 取前几个句子
-        summary = ""
-        for sentence in sentences:
-            if len(summary + sentence) <= max_length:
-                summary += sentence + "。"
-            else:
-                break
-        
-        if not summary:
-            return text[:max_length] + "..."
-        
-        return summary.strip()
+    return ("。".join(parts) + "。").strip()
+
+
+def count_words(text: str) -> int:
+    """
+    计算文本字数
     
-    def count_words(self, text: str) -> int:
-        """
-        计算文本字数
-        
-        Args:
-            text: 文本
-            
-        Returns:
-            字数
-        """
-        if not text:
-            return 0
-        
-        # 中文按字符计数，英文按单词计数
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fa5]', text))
-        english_words = len(re.findall(r'[a-zA-Z]+', text))
-        
-        return chinese_chars + english_words
+    Args:
+        text: 文本
+        
+    Returns:
+        字数
+    """
+    if not text:
+        return 0
     
-    def detect_language(self, text: str) -> str:
-        """
-        检测文本语言
-        
-        Args:
-            text: 文本
-            
-        Returns:
-            语言代码 (zh, en, etc.)
-        """
-        if not text:
-            return "unknown"
-        
-        # 简单的语言检测
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fa5]', text))
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        
-        if chinese_chars > english_chars:
-            return "zh"
-        elif english_chars > chinese_chars:
-            return "en"
-        else:
-            return "mixed"
-    
-    def extract_quotes(self, text: str) -> List[str]:
-        """
-        提取引用或重要语句
-        
-        Args:
-            text: 文本
-            
-        Returns:
-            引用列表
-        """
-        quotes = []
-        
-        # 提取引号内的内容
-        quote_patterns = [
-            r'"([^"]+)"',
-            r'"([^"]+)"',
-            r'『([^』]+)』',
-            r'「([^」]+)」'
-        ]
-        
-        for pattern in quote_patterns:
-            matches = re.findall(pattern, text)
-            quotes.extend(matches)
-        
-        # 提取重要句子（包含评价性词汇的句子）
-        sentences = self.split_sentences(text)
-        evaluative_words = [
-            '精彩', '优秀', '出色', '震撼', '感动', '经典', '推荐',
-            '糟糕', '失望', '无聊', '难看', '雷人', '狗血', '老套',
-            '创新', '突破', '惊喜', '惊艳', '完美', '失败'
-        ]
-        
-        for sentence in sentences:
-            for word in evaluative_words:
-                if word in sentence and sentence not in quotes:
-                    quotes.append(sentence)
-                    break
-        
-        return quotes[:5]  # 返回前5个引用
+    # 中文按字符计数，英文按单词计数（纯ASCII文本没有中文字符，跳过中文统计）
+    if text.isascii():
+        return len(_ENGLISH_WORD_RE.findall(text))
     
-    def format_review(self, content: str, title: str, rating: float) -> str:
-        """
-        格式化影评内容
-        
-        Args:
-            content: 影评内容
-            title: 电影标题
-            rating: 评分
-            
-        Returns:
-            格式化后的影评
-        """
-        formatted = f"# 《{title}》影评\n\n"
-        formatted += f"**综合评分：{rating}/10**\n\n"
-        formatted += f"{content}"
+    chinese_chars = sum(map(len, _CHINESE_RUN_RE.findall(text)))
+    english_words = len(_ENGLISH_WORD_RE.findall(text))
+    
+    return chinese_chars + english_words
+
+
+def detect_language(text: str) -> str:
+    """
+    检测文本语言
+    
+    Args:
+        text: 文本
+        
+    Returns:
+        语言代码 (zh, en, etc.)
+    """
+    if not text:
+        return "unknown"
+    
+    # 纯ASCII文本没有中文字符：有英文字母即为英文，否则两者都为0
+    if text.isascii():
+        return "en" if _ENGLISH_WORD_RE.search(text) else "mixed"
+    
+    # 简单的语言检测
+    chinese_chars = sum(map(len, _CHINESE_RUN_RE.findall(text)))
+    english_chars = sum(map(len, _ENGLISH_WORD_RE.findall(text)))
+    
+    if chinese_chars > english_chars:
+        return "zh"
+    elif english_chars > chinese_chars:
+        return "en"
+    else:
+        return "mixed"
+
+
+def extract_quotes(text: str) -> List[str]:
+    """
+    提取引用或重要语句
+    
+    Args:
+        text: 文本
         
-        return formatted
\ No newline at end of file
+    Returns:
+        引用列表
+    """
+    quotes = []
+    
+    # 提取引号内的内容
+    for pattern in _QUOTE_PATTERNS:
+        matches = pattern.findall(text)
+        quotes.extend(matches)
+    
+    # 提取重要句子（包含评价性词汇的句子），已收录的语句用集合判重，凑满5个即停止
+    seen = set(quotes)
+    for sentence in split_sentences(text):
+        if len(quotes) >= 5:
+            break
+        if sentence not in seen and _EVALUATIVE_RE.search(sentence):
+            quotes.append(sentence)
+            seen.add(sentence)
+    
+    return quotes[:5]  # 返回前5个引用
+
+
+def format_review(content: str, title: str, rating: float) -> str:
+    """
+    格式化影评内容
+    
+    Args:
+        content: 影评内容
+        title: 电影标题
+        rating: 评分
+        
+    Returns:
+        格式化后的影评
+    """
+    formatted = f"# 《{title}》影评\n\n"
+    formatted += f"**综合评分：{rating}/10**\n\n"
+    formatted += f"{content}"
+    
+    return formatted
+
+
+class TextProcessor:
+    """文本处理器（兼容旧接口，各方法直接转发到模块级函数）"""
+    
+    __slots__ = ()
+    
+    clean_text = staticmethod(clean_text)
+    extract_movie_title = staticmethod(extract_movie_title)
+    extract_year = staticmethod(extract_year)
+    split_sentences = staticmethod(split_sentences)
+    extract_keywords = staticmethod(extract_keywords)
+    summarize_text = staticmethod(summarize_text)
+    count_words = staticmethod(count_words)
+    detect_language = staticmethod(detect_language)
+    extract_quotes = staticmethod(extract_quotes)
+    format_review = staticmethod(format_review)
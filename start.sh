@@ -17,7 +17,7 @@ echo "✅ API密钥已配置"
 
 # 启动FastAPI服务
 echo "🚀 启动FastAPI服务..."
-python3 -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload --access-log &
+python3 -m uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload --access-log &
 FASTAPI_PID=$!
 
 # 等待FastAPI服务启动